@@ -8,15 +8,39 @@ import click
 import json
 from pathlib import Path
 from typing import Optional
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.table import Table
+from rich.text import Text
 
 from core.config import Config
-from core.uploader import MemoryUploader
-from core.searcher import MemorySearcher
+from core.utils import JsonCodec, ResultDisplayer
 
-console = Console()
+# Output is mostly emoji-prefixed plain text; skip Rich's auto-highlighting pass
+console = Console(highlight=False)
+
+# core.uploader and core.searcher pull in the Mem0 SDK (~0.8s to import), so
+# each command imports the one it needs instead of paying for it on --help
+
+def _render_custom_settings(custom_instructions: Optional[str], includes: Optional[str],
+                            excludes: Optional[str], infer: Optional[bool]) -> Optional[Group]:
+    """Build the "Applied Settings" block, or None when no setting was applied."""
+    settings = [
+        ("🎯 Custom Instructions:", custom_instructions),
+        ("✅ Includes:", includes),
+        ("❌ Excludes:", excludes),
+        ("🧠 Infer:", infer),
+    ]
+    rows = [(f"  {label}", str(value)) for label, value in settings if value not in (None, "")]
+    if not rows:
+        return None
+    
+    table = Table.grid(padding=(0, 1))
+    table.add_column(no_wrap=True)
+    table.add_column()
+    for row in rows:
+        table.add_row(*row)
+    return Group(Text("\n📋 Applied Settings:"), table)
 
 @click.group()
 @click.version_option(version="1.0.0")
@@ -35,19 +59,20 @@ def cli():
 @click.option('--batch-size', type=int, help='Batch size for processing long message lists (default: from config)')
 @click.option('--disable-batching', is_flag=True, help='Disable automatic batch processing for long messages')
 @click.option('--use-defaults', is_flag=True, help='Use persistent settings from config file')
+@click.option('--no-cache', is_flag=True, help='Upload even if identical content was uploaded before')
 def upload_text(content: str, user_id: Optional[str], metadata: Optional[str],
                custom_instructions: Optional[str], includes: Optional[str], excludes: Optional[str],
-               infer: Optional[bool], batch_size: Optional[int], disable_batching: bool, use_defaults: bool):
+               infer: Optional[bool], batch_size: Optional[int], disable_batching: bool, use_defaults: bool,
+               no_cache: bool):
     """Upload text content to Mem0."""
     try:
         config = Config()
-        uploader = MemoryUploader(config)
         
         # Parse metadata if provided
         meta_dict = None
         if metadata:
             try:
-                meta_dict = json.loads(metadata)
+                meta_dict = JsonCodec.loads(metadata)
             except json.JSONDecodeError:
                 console.print("❌ Invalid JSON format for metadata")
                 return
@@ -65,36 +90,40 @@ def upload_text(content: str, user_id: Optional[str], metadata: Optional[str],
             if final_infer is None:
                 final_infer = config.advanced_infer
         
+        upload_settings = {
+            'custom_instructions': final_custom_instructions.strip() if final_custom_instructions else None,
+            'includes': final_includes.strip() if final_includes else None,
+            'excludes': final_excludes.strip() if final_excludes else None,
+            'infer': final_infer,
+        }
+        
+        from core.uploader import MemoryUploader
+        uploader = MemoryUploader(config)
         result = uploader.upload_text(
             content=content,
             user_id=user_id,
             extract_mode="auto",  # Always use auto mode now
             metadata=meta_dict,
-            custom_instructions=final_custom_instructions.strip() if final_custom_instructions else None,
-            includes=final_includes.strip() if final_includes else None,
-            excludes=final_excludes.strip() if final_excludes else None,
-            infer=final_infer,
             batch_size=batch_size,
-            disable_batching=disable_batching
+            disable_batching=disable_batching,
+            force=no_cache,
+            **upload_settings
         )
         
+        if isinstance(result, dict) and result.get("near_duplicate_of"):
+            console.print(Panel(f"♻️  Near-identical to already uploaded {result['near_duplicate_of']} (use --no-cache to upload again)", title="Upload Skipped"))
+            return
+        if isinstance(result, dict) and result.get("cached"):
+            console.print(Panel("♻️  Identical text was already uploaded (use --no-cache to upload again)", title="Upload Skipped"))
+            return
+        
         console.print(Panel(f"✅ Successfully uploaded text memory", title="Upload Complete"))
         
         # Show applied settings
-        applied_settings = []
-        if final_custom_instructions:
-            applied_settings.append(f"🎯 Custom Instructions: {final_custom_instructions}")
-        if final_includes:
-            applied_settings.append(f"✅ Includes: {final_includes}")
-        if final_excludes:
-            applied_settings.append(f"❌ Excludes: {final_excludes}")
-        if final_infer is not None:
-            applied_settings.append(f"🧠 Infer: {final_infer}")
-        
+        applied_settings = _render_custom_settings(final_custom_instructions, final_includes,
+                                                   final_excludes, final_infer)
         if applied_settings:
-            console.print("\n📋 Applied Settings:")
-            for setting in applied_settings:
-                console.print(f"  {setting}")
+            console.print(applied_settings)
         
     except Exception as e:
         console.print(f"❌ Upload failed: {str(e)}")
@@ -109,13 +138,14 @@ def upload_text(content: str, user_id: Optional[str], metadata: Optional[str],
 @click.option('--batch-size', type=int, help='Batch size for processing long message lists (default: from config)')
 @click.option('--disable-batching', is_flag=True, help='Disable automatic batch processing for long messages')
 @click.option('--use-defaults', is_flag=True, help='Use persistent settings from config file')
+@click.option('--no-cache', is_flag=True, help='Upload even if identical content was uploaded before')
 def upload_file(file_path: str, user_id: Optional[str],
                custom_instructions: Optional[str], includes: Optional[str], excludes: Optional[str],
-               infer: Optional[bool], batch_size: Optional[int], disable_batching: bool, use_defaults: bool):
+               infer: Optional[bool], batch_size: Optional[int], disable_batching: bool, use_defaults: bool,
+               no_cache: bool):
     """Upload a single file to Mem0."""
     try:
         config = Config()
-        uploader = MemoryUploader(config)
         
         # Use persistent config settings if requested or no CLI args provided
         final_custom_instructions = custom_instructions
@@ -130,35 +160,39 @@ def upload_file(file_path: str, user_id: Optional[str],
             if final_infer is None:
                 final_infer = config.advanced_infer
         
+        upload_settings = {
+            'custom_instructions': final_custom_instructions.strip() if final_custom_instructions else None,
+            'includes': final_includes.strip() if final_includes else None,
+            'excludes': final_excludes.strip() if final_excludes else None,
+            'infer': final_infer,
+        }
+        
+        from core.uploader import MemoryUploader
+        uploader = MemoryUploader(config)
         result = uploader.upload_file(
             file_path=file_path,
             user_id=user_id,
             extract_mode="auto",  # Always use auto mode now
-            custom_instructions=final_custom_instructions.strip() if final_custom_instructions else None,
-            includes=final_includes.strip() if final_includes else None,
-            excludes=final_excludes.strip() if final_excludes else None,
-            infer=final_infer,
             batch_size=batch_size,
-            disable_batching=disable_batching
+            disable_batching=disable_batching,
+            force=no_cache,
+            **upload_settings
         )
         
+        if isinstance(result, dict) and result.get("near_duplicate_of"):
+            console.print(Panel(f"♻️  {file_path} is near-identical to already uploaded {result['near_duplicate_of']} (use --no-cache to upload again)", title="Upload Skipped"))
+            return
+        if isinstance(result, dict) and result.get("cached"):
+            console.print(Panel(f"♻️  Identical file was already uploaded: {file_path} (use --no-cache to upload again)", title="Upload Skipped"))
+            return
+        
         console.print(Panel(f"✅ Successfully uploaded file: {file_path}", title="Upload Complete"))
         
         # Show applied settings
-        applied_settings = []
-        if final_custom_instructions:
-            applied_settings.append(f"🎯 Custom Instructions: {final_custom_instructions}")
-        if final_includes:
-            applied_settings.append(f"✅ Includes: {final_includes}")
-        if final_excludes:
-            applied_settings.append(f"❌ Excludes: {final_excludes}")
-        if final_infer is not None:
-            applied_settings.append(f"🧠 Infer: {final_infer}")
-        
+        applied_settings = _render_custom_settings(final_custom_instructions, final_includes,
+                                                   final_excludes, final_infer)
         if applied_settings:
-            console.print("\n📋 Applied Settings:")
-            for setting in applied_settings:
-                console.print(f"  {setting}")
+            console.print(applied_settings)
         
     except Exception as e:
         console.print(f"❌ Upload failed: {str(e)}")
@@ -168,17 +202,19 @@ def upload_file(file_path: str, user_id: Optional[str],
 @click.option('--user-id', '-u', help='User ID for the memories')
 @click.option('--recursive/--no-recursive', default=True, help='Search subdirectories recursively')
 @click.option('--concurrent/--no-concurrent', default=None, help='Use concurrent processing (default: from config)')
+@click.option('--group/--no-group', default=None, help='Pack small files into one API call per group (default: from config)')
 @click.option('--custom-instructions', '--ci', help='Custom instructions for AI processing (overrides config)')
 @click.option('--includes', '--inc', help='Content types to specifically include (overrides config)')
 @click.option('--excludes', '--exc', help='Content types to exclude from processing (overrides config)')
 @click.option('--infer/--no-infer', default=None, help='Whether to infer memories (overrides config)')
 @click.option('--use-defaults', is_flag=True, help='Use persistent settings from config file')
 def upload_directory(directory_path: str, user_id: Optional[str], recursive: bool, concurrent: Optional[bool],
-                    custom_instructions: Optional[str], includes: Optional[str], excludes: Optional[str],
+                    group: Optional[bool], custom_instructions: Optional[str], includes: Optional[str], excludes: Optional[str],
                     infer: Optional[bool], use_defaults: bool):
     """Upload all supported files from a directory with enhanced batch processing."""
     try:
         config = Config()
+        from core.uploader import MemoryUploader
         uploader = MemoryUploader(config)
         
         # Use persistent config settings if requested or no CLI args provided
@@ -194,79 +230,56 @@ def upload_directory(directory_path: str, user_id: Optional[str], recursive: boo
             if final_infer is None:
                 final_infer = config.advanced_infer
         
-        # Find files first
-        import os
-        from pathlib import Path
-        
-        supported_extensions = config.supported_formats
-        file_paths = []
-        
-        if recursive:
-            for root, dirs, files in os.walk(directory_path):
-                for file in files:
-                    if any(file.lower().endswith(ext) for ext in supported_extensions):
-                        file_paths.append(os.path.join(root, file))
-        else:
-            for file in os.listdir(directory_path):
-                file_path = os.path.join(directory_path, file)
-                if os.path.isfile(file_path) and any(file.lower().endswith(ext) for ext in supported_extensions):
-                    file_paths.append(file_path)
-        
-        if not file_paths:
-            console.print("📭 No supported files found in the directory")
-            return
-        
-        console.print(f"📁 Found {len(file_paths)} files to upload")
-        
-        # Use enhanced batch upload
-        results = uploader.upload_batch(
-            file_paths=file_paths,
+        results = uploader.upload_directory(
+            directory_path=directory_path,
             user_id=user_id,
             extract_mode="auto",
+            recursive=recursive,
             custom_instructions=final_custom_instructions.strip() if final_custom_instructions else None,
             includes=final_includes.strip() if final_includes else None,
             excludes=final_excludes.strip() if final_excludes else None,
             infer=final_infer,
-            concurrent_upload=concurrent
+            concurrent_upload=concurrent,
+            group_files=group
         )
         
+        if not results:
+            return
+        
         # Show detailed summary
         success_count = sum(1 for r in results if r["status"] == "success")
-        error_count = len(results) - success_count
+        error_count = sum(1 for r in results if r["status"] == "error")
+        skipped_count = len(results) - success_count - error_count
         total_attempts = sum(r.get("attempts", 0) for r in results)
         
-        console.print(Panel(
+        summary = (
             f"📊 Enhanced Batch Upload Summary:\n"
-            f"✅ Successful: {success_count}/{len(file_paths)}\n"
-            f"❌ Failed: {error_count}/{len(file_paths)}\n"
-            f"🔄 Total attempts: {total_attempts}\n"
-            f"📈 Success rate: {(success_count/len(file_paths)*100):.1f}%",
-            title="Batch Upload Complete"
-        ))
+            f"✅ Successful: {success_count}/{len(results)}\n"
+            f"❌ Failed: {error_count}/{len(results)}\n"
+            f"🔄 Total attempts: {total_attempts}"
+        )
+        if skipped_count:
+            summary += f"\n♻️  Duplicates skipped: {skipped_count}"
+        if success_count + error_count:
+            summary += f"\n📈 Success rate: {(success_count/(success_count + error_count)*100):.1f}%"
+        renderables = [Panel(summary, title="Batch Upload Complete")]
         
         # Show applied settings
-        applied_settings = []
-        if final_custom_instructions:
-            applied_settings.append(f"🎯 Custom Instructions: {final_custom_instructions}")
-        if final_includes:
-            applied_settings.append(f"✅ Includes: {final_includes}")
-        if final_excludes:
-            applied_settings.append(f"❌ Excludes: {final_excludes}")
-        if final_infer is not None:
-            applied_settings.append(f"🧠 Infer: {final_infer}")
-        
+        applied_settings = _render_custom_settings(final_custom_instructions, final_includes,
+                                                   final_excludes, final_infer)
         if applied_settings:
-            console.print("\n📋 Applied Settings:")
-            for setting in applied_settings:
-                console.print(f"  {setting}")
+            renderables.append(applied_settings)
         
         # Show errors if any
         if error_count > 0:
-            console.print("\n🚨 Failed Files:")
+            failed = Text("\n🚨 Failed Files:")
             for result in results:
                 if result["status"] == "error":
                     attempts = result.get("attempts", 0)
-                    console.print(f"  ❌ {result['file']} (after {attempts} attempts): {result['error']}")
+                    failed.append(f"\n  ❌ {result['file']} (after {attempts} attempts): {result['error']}")
+            renderables.append(failed)
+        
+        console.print(Group(*renderables))
         
     except Exception as e:
         console.print(f"❌ Batch upload failed: {str(e)}")
@@ -280,6 +293,7 @@ def search(query: str, user_id: Optional[str], limit: Optional[int], show_full:
     """Search memories by query."""
     try:
         config = Config()
+        from core.searcher import MemorySearcher
         searcher = MemorySearcher(config)
         
         results = searcher.search_by_query(
@@ -308,6 +322,7 @@ def search_time(days: Optional[int], start_date: Optional[str], end_date: Option
     """Search memories within a time range."""
     try:
         config = Config()
+        from core.searcher import MemorySearcher
         searcher = MemorySearcher(config)
         
         results = searcher.search_by_time_range(
@@ -334,6 +349,7 @@ def weekly_report(weeks_back: int, user_id: Optional[str], output: Optional[str]
     """Generate data for weekly report."""
     try:
         config = Config()
+        from core.searcher import MemorySearcher
         searcher = MemorySearcher(config)
         
         report_data = searcher.search_weekly_report_data(
@@ -342,27 +358,29 @@ def weekly_report(weeks_back: int, user_id: Optional[str], output: Optional[str]
         )
         
         # Display summary
-        console.print(Panel(
+        renderables = [Panel(
             f"📅 Week: {report_data['week_start']} to {report_data['week_end']}\n"
             f"📝 Current week memories: {report_data['summary']['total_current']}\n"
             f"🔗 Related historical memories: {report_data['summary']['total_related']}",
             title=f"Weekly Report Data (Week {weeks_back} ago)"
-        ))
+        )]
         
         # Show current week memories
         if report_data['week_memories']:
-            console.print("\n📅 Current Week Memories:")
-            searcher.display_search_results(report_data['week_memories'][:10])
+            renderables.append(Text("\n📅 Current Week Memories:"))
+            renderables.append(ResultDisplayer.build_console_table(report_data['week_memories'][:10]))
         
         # Show related memories
         if report_data['related_memories']:
-            console.print("\n🔗 Related Historical Memories:")
-            searcher.display_search_results(report_data['related_memories'][:5])
+            renderables.append(Text("\n🔗 Related Historical Memories:"))
+            renderables.append(ResultDisplayer.build_console_table(report_data['related_memories'][:5]))
+        
+        console.print(Group(*renderables))
         
         # Save to file if requested
         if output:
-            with open(output, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, indent=2, ensure_ascii=False)
+            with open(output, 'wb') as f:
+                f.write(JsonCodec.dumps(report_data, indent=True))
             console.print(f"\n💾 Report data saved to: {output}")
         
     except Exception as e:
@@ -377,6 +395,7 @@ def search_related(content: str, user_id: Optional[str], limit: Optional[int], e
     """Search for memories related to given content."""
     try:
         config = Config()
+        from core.searcher import MemorySearcher
         searcher = MemorySearcher(config)
         
         # Build exclusion filter if specified
@@ -409,6 +428,7 @@ def stats(user_id: Optional[str]):
     """Show user memory statistics."""
     try:
         config = Config()
+        from core.searcher import MemorySearcher
         searcher = MemorySearcher(config)
         
         stats_data = searcher.get_user_stats(user_id)
@@ -422,19 +442,19 @@ def stats(user_id: Optional[str]):
         table.add_row("Total Memories", str(stats_data["total_memories"]))
         table.add_row("Recent (7 days)", str(stats_data["recent_memories_7d"]))
         
-        console.print(table)
+        renderables = [table]
         
         # Sources breakdown
         if stats_data["sources"]:
-            console.print("\n📋 Sources:")
-            for source, count in stats_data["sources"].items():
-                console.print(f"  • {source}: {count}")
+            renderables.append(Text("\n📋 Sources:\n" + "\n".join(
+                f"  • {source}: {count}" for source, count in stats_data["sources"].items())))
         
         # Extract modes breakdown
         if stats_data["extract_modes"]:
-            console.print("\n⚙️  Extract Modes:")
-            for mode, count in stats_data["extract_modes"].items():
-                console.print(f"  • {mode}: {count}")
+            renderables.append(Text("\n⚙️  Extract Modes:\n" + "\n".join(
+                f"  • {mode}: {count}" for mode, count in stats_data["extract_modes"].items())))
+        
+        console.print(Group(*renderables))
         
     except Exception as e:
         console.print(f"❌ Stats retrieval failed: {str(e)}")
@@ -455,7 +475,10 @@ def config_check():
         if config.mem0_api_key:
             from core.uploader import MemoryUploader
             uploader = MemoryUploader(config)
-            console.print("  • API Connection: ✅ Connected")
+            if uploader.ping():
+                console.print("  • API Connection: ✅ Connected")
+            else:
+                console.print("  • API Connection: ❌ API key accepted but reading memories failed")
         else:
             console.print("  • API Connection: ❌ No API key")
             console.print("\n💡 Please set MEM0_API_KEY environment variable")
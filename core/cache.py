@@ -0,0 +1,241 @@
+"""Local cache of upload results keyed by content hash."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple
+
+_MASK64 = (1 << 64) - 1
+
+
+def _shingle_hashes(text: str, shingle_size: int = 5) -> List[int]:
+    """Hash each run of shingle_size consecutive lowercase words to 64 bits."""
+    words = text.lower().split()
+    if not words:
+        return []
+
+    return [
+        int.from_bytes(hashlib.blake2b(' '.join(words[i:i + shingle_size]).encode('utf-8'),
+                                       digest_size=8).digest(), 'big')
+        for i in range(max(1, len(words) - shingle_size + 1))
+    ]
+
+
+def _simhash_reduce(hashes: List[int]) -> int:
+    """Set each bit that is set in more than half of the hashes."""
+    if not hashes:
+        return 0
+
+    # Lay the hashes out as one bit string and count each bit position with
+    # a strided slice, keeping the per-bit work inside str.count
+    bit_string = ''.join([format(h, '064b') for h in hashes])
+    count = len(hashes)
+    bits = ''.join('1' if 2 * bit_string[bit::64].count('1') > count else '0'
+                   for bit in range(64))
+    return int(bits, 2)
+
+
+def simhash64(text: str, shingle_size: int = 5) -> int:
+    """
+    Compute a 64-bit SimHash of text from its word shingles.
+
+    Near-identical texts (a fixed typo, reflowed whitespace) differ in only a
+    few bits, so the Hamming distance between two hashes measures similarity.
+
+    Args:
+        text: Text to fingerprint
+        shingle_size: Number of consecutive words per shingle
+
+    Returns:
+        Signed 64-bit integer, so it fits a SQLite INTEGER column
+    """
+    value = _simhash_reduce(_shingle_hashes(text, shingle_size))
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _hamming(a: int, b: int) -> int:
+    """Count differing bits between two signed 64-bit hashes."""
+    return bin((a ^ b) & _MASK64).count('1')
+
+
+class UploadCache:
+    """SQLite-backed cache that remembers which payloads were already uploaded."""
+
+    def __init__(self, db_path: str = "~/.mem0_client_cache.db", ttl_days: int = 7,
+                 max_distance: Optional[int] = 3):
+        """
+        Initialize the cache and create its table if needed.
+
+        Args:
+            db_path: Location of the SQLite database file
+            ttl_days: Days before a cached entry expires (0 = never)
+            max_distance: SimHash bit distance still treated as a hit (None = exact only)
+        """
+        self.db_path = os.path.expanduser(db_path)
+        self.ttl_seconds = ttl_days * 86400
+        self.max_distance = max_distance
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS uploads "
+                "(key TEXT PRIMARY KEY, result BLOB, ts INTEGER, simhash INTEGER, params_key TEXT, source TEXT)"
+            )
+            # Databases created before near-duplicate matching lack the extra columns
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(uploads)")}
+            for column, column_type in (("simhash", "INTEGER"), ("params_key", "TEXT"), ("source", "TEXT")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE uploads ADD COLUMN {column} {column_type}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_params ON uploads (params_key)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection that commits on success."""
+        conn = sqlite3.connect(self.db_path)
+        conn.create_function("HAMMING", 2, _hamming, deterministic=True)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def text_digest(content: str) -> str:
+        """Get the SHA-256 hex digest of text content."""
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def file_digest(file_path: str) -> str:
+        """Get the SHA-256 hex digest of a file without loading it into memory."""
+        with open(file_path, 'rb') as f:
+            return UploadCache.stream_digest(f)
+
+    @staticmethod
+    def stream_digest(f: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+        """Get the SHA-256 hex digest of an open binary file, read from its current position."""
+        # Python 3.11+ hashes straight from the file buffer
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def params_key(**params) -> str:
+        """Build a key from the upload parameters alone, ignoring content."""
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_key(content_digest: str, **params) -> str:
+        """
+        Build a cache key from a content digest and the upload parameters.
+
+        Args:
+            content_digest: Digest from text_digest() or file_digest()
+            **params: Anything that changes what Mem0 stores (user_id, instructions, ...)
+
+        Returns:
+            Hex key identifying this exact upload
+        """
+        payload = json.dumps([content_digest, params], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, simhash: Optional[int] = None,
+            params_key: Optional[str] = None) -> Optional[Any]:
+        """
+        Get the cached result for an upload.
+
+        Same matching as lookup(), without saying whether the hit was exact.
+
+        Returns:
+            Cached result, or None if missing or expired
+        """
+        hit = self.lookup(key, simhash, params_key)
+        return hit[0] if hit is not None else None
+
+    def lookup(self, key: str, simhash: Optional[int] = None,
+               params_key: Optional[str] = None) -> Optional[Tuple[Any, Optional[str]]]:
+        """
+        Find the cached result for an upload.
+
+        Falls back to a near-duplicate match when the exact key misses and
+        both simhash and params_key are given. Near matches must share the
+        same parameters, so changed instructions or filters never hit.
+
+        Args:
+            key: Exact key from make_key()
+            simhash: SimHash of the content from simhash64()
+            params_key: Key from params_key() for the same parameters
+
+        Returns:
+            Tuple of (result, near_duplicate_of), where near_duplicate_of is
+            None for an exact hit and otherwise the source stored with the
+            matching upload (its key when none was stored); None if missing
+            or expired
+        """
+        cutoff = int(time.time()) - self.ttl_seconds if self.ttl_seconds else None
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT result, ts FROM uploads WHERE key = ?", (key,)).fetchone()
+            if row is not None and cutoff is not None and row[1] < cutoff:
+                conn.execute("DELETE FROM uploads WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                return json.loads(row[0]), None
+
+            if simhash is not None and params_key is not None and self.max_distance is not None:
+                row = conn.execute(
+                    "SELECT result, key, source FROM uploads "
+                    "WHERE params_key = ? AND simhash IS NOT NULL AND ts >= ? "
+                    "AND HAMMING(simhash, ?) <= ? ORDER BY ts DESC LIMIT 1",
+                    (params_key, cutoff or 0, simhash, self.max_distance)
+                ).fetchone()
+                if row is not None:
+                    return json.loads(row[0]), row[2] or row[1]
+
+        return None
+
+    def set(self, key: str, result: Any, simhash: Optional[int] = None,
+            params_key: Optional[str] = None, source: Optional[str] = None):
+        """
+        Store the result of a successful upload.
+
+        Args:
+            key: Exact key from make_key()
+            result: Upload result to return on later hits
+            simhash: SimHash of the content, for near-duplicate matching
+            params_key: Key from params_key() for the upload parameters
+            source: What was uploaded (file name or text preview), reported on near matches
+        """
+        data = json.dumps(result, ensure_ascii=False, default=str)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO uploads (key, result, ts, simhash, params_key, source) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data, int(time.time()), simhash, params_key, source)
+            )
+
+    def clear(self, expired_only: bool = False) -> int:
+        """
+        Delete cached upload results.
+
+        Args:
+            expired_only: Only delete entries older than the TTL
+
+        Returns:
+            Number of entries deleted
+        """
+        with self._connect() as conn:
+            if expired_only:
+                if not self.ttl_seconds:
+                    return 0
+                cursor = conn.execute("DELETE FROM uploads WHERE ts < ?",
+                                      (int(time.time()) - self.ttl_seconds,))
+            else:
+                cursor = conn.execute("DELETE FROM uploads")
+            return cursor.rowcount
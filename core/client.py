@@ -0,0 +1,50 @@
+"""Shared Mem0 client and the process-wide memory write counter."""
+
+import os
+import threading
+from typing import Dict, Tuple
+from mem0 import MemoryClient
+
+# Successful add() calls in this process. Cached reads (searcher, web app)
+# remember the count they were fetched at and are not reused once it moves on.
+_write_lock = threading.Lock()
+_write_generation = 0
+
+
+def memory_write_generation() -> int:
+    """Get the number of successful add() calls so far in this process."""
+    return _write_generation
+
+
+def _record_memory_write():
+    """Count a successful add(), making earlier cached reads stale."""
+    global _write_generation
+    with _write_lock:
+        _write_generation += 1
+
+
+# One MemoryClient per API key, shared by every uploader and searcher in the
+# process so they reuse its HTTP connection pool
+_CLIENT_CACHE: Dict[str, MemoryClient] = {}
+
+
+def get_memory_client(api_key: str) -> Tuple[MemoryClient, bool]:
+    """
+    Get the shared Mem0 client for an API key, creating it on first use.
+    
+    Creating a client validates the key with a request to Mem0, so later
+    uploaders and searchers skip that round-trip.
+    
+    Args:
+        api_key: Mem0 API key
+        
+    Returns:
+        Tuple of (client, created) where created is True on first use
+    """
+    client = _CLIENT_CACHE.get(api_key)
+    if client is not None:
+        return client, False
+    
+    os.environ['MEM0_API_KEY'] = api_key
+    client = _CLIENT_CACHE.setdefault(api_key, MemoryClient(api_key=api_key))
+    return client, True
@@ -1,126 +1,132 @@
 """Configuration management for Mem0 Client."""
 
+import copy
 import os
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, FrozenSet, Mapping, Optional, Tuple
 from dotenv import load_dotenv
 
+# Use the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# .env only needs to be read once per process
+_env_loaded = False
+
+# Directories never worth scanning for uploads (file_processing.ignore_dirs overrides)
+DEFAULT_IGNORE_DIRS = (
+    'node_modules', '__pycache__', 'venv', 'dist', 'build',
+)
+
+
 class Config:
     """Configuration manager for Mem0 Client."""
     
+    # Parsed config files keyed by (path, mtime), shared by all instances
+    _CACHE: Dict[Tuple[str, float], Dict[str, Any]] = {}
+    
     def __init__(self, config_path: Optional[str] = None):
         """Initialize configuration manager."""
+        global _env_loaded
+        
         # Load environment variables
-        load_dotenv()
+        if not _env_loaded:
+            load_dotenv()
+            _env_loaded = True
         
         # Load config file
         if config_path is None:
             config_path = Path(__file__).parent.parent / "config.yaml"
         
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
-    
-    @property
-    def mem0_api_key(self) -> str:
-        """Get Mem0 API key from environment or config."""
-        return os.getenv('MEM0_API_KEY') or self.config.get('mem0', {}).get('api_key', '')
-    
-    @property
-    def default_user_id(self) -> str:
-        """Get default user ID."""
-        return os.getenv('DEFAULT_USER_ID') or self.config.get('defaults', {}).get('user_id', 'default_user')
-    
-    @property
-    def default_extract_mode(self) -> str:
-        """Get default extract mode."""
-        return self.config.get('defaults', {}).get('extract_mode', 'auto')
-    
-    @property
-    def batch_size(self) -> int:
-        """Get batch processing size."""
-        return self.config.get('defaults', {}).get('batch_size', 10)
-    
-    @property
-    def supported_formats(self) -> list:
-        """Get supported file formats."""
-        return self.config.get('file_processing', {}).get('supported_formats', ['.md', '.txt'])
-    
-    @property
-    def max_file_size_mb(self) -> int:
-        """Get maximum file size in MB."""
-        return self.config.get('file_processing', {}).get('max_file_size_mb', 10)
-    
-    @property
-    def search_default_limit(self) -> int:
-        """Get default search limit."""
-        return self.config.get('search', {}).get('default_limit', 10)
-    
-    @property
-    def search_max_limit(self) -> int:
-        """Get maximum search limit."""
-        return self.config.get('search', {}).get('max_limit', 100)
-    
-    @property
-    def debug_logging(self) -> bool:
-        """Get debug logging setting."""
-        return self.config.get('debug', {}).get('enable_api_logging', True)
-    
-    @property
-    def message_batch_threshold(self) -> int:
-        """Get message batch threshold."""
-        return self.config.get('message_processing', {}).get('batch_threshold', 10)
-    
-    @property 
-    def message_batch_size(self) -> int:
-        """Get message batch size."""
-        return self.config.get('message_processing', {}).get('batch_size', 8)
+        self.config = self._load_config_file(str(config_path))
+        self._load_settings()
     
-    @property
-    def enable_message_batching(self) -> bool:
-        """Get whether message batching is enabled."""
-        return self.config.get('message_processing', {}).get('enable_batching', True)
-    
-    # Advanced settings properties
-    @property
-    def advanced_custom_instructions(self) -> str:
-        """Get persistent custom instructions."""
-        return self.config.get('advanced_settings', {}).get('custom_instructions', '')
-    
-    @property
-    def advanced_includes(self) -> str:
-        """Get persistent includes."""
-        return self.config.get('advanced_settings', {}).get('includes', '')
-    
-    @property
-    def advanced_excludes(self) -> str:
-        """Get persistent excludes."""
-        return self.config.get('advanced_settings', {}).get('excludes', '')
-    
-    @property
-    def advanced_exclude_presets(self) -> list:
-        """Get persistent exclude presets."""
-        return self.config.get('advanced_settings', {}).get('exclude_presets', [])
-    
-    @property
-    def advanced_infer(self) -> bool:
-        """Get persistent infer setting."""
-        return self.config.get('advanced_settings', {}).get('infer', True)
-    
-    # File processing properties
-    @property
-    def concurrent_upload(self) -> bool:
-        """Get whether concurrent file uploads are enabled."""
-        return self.config.get('file_processing', {}).get('concurrent_upload', True)
-    
-    @property
-    def max_concurrent_files(self) -> int:
-        """Get maximum number of concurrent file uploads."""
-        return self.config.get('file_processing', {}).get('max_concurrent_files', 3)
+    @classmethod
+    def _load_config_file(cls, config_path: str) -> Dict[str, Any]:
+        """
+        Parse a config file, reusing the cached result while it is unchanged.
+        
+        Each call gets its own deep copy, so one instance's edits (e.g.
+        update_advanced_settings) never leak into the cache or other instances.
+        """
+        key = (config_path, os.path.getmtime(config_path))
+        config = cls._CACHE.get(key)
+        if config is None:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = yaml.load(f, Loader=_YamlLoader)
+            
+            # Drop entries for older versions of the same file
+            for stale_key in [k for k in cls._CACHE if k[0] == config_path]:
+                del cls._CACHE[stale_key]
+            cls._CACHE[key] = config
+        return copy.deepcopy(config)
+    
+    def _load_settings(self):
+        """Resolve settings from the environment and config into plain attributes."""
+        config = self.config
+        mem0 = config.get('mem0', {})
+        defaults = config.get('defaults', {})
+        file_processing = config.get('file_processing', {})
+        search = config.get('search', {})
+        message_processing = config.get('message_processing', {})
+        advanced = config.get('advanced_settings', {})
+        upload_cache = config.get('upload_cache', {})
+        
+        self.mem0_api_key: str = os.getenv('MEM0_API_KEY') or mem0.get('api_key', '')
+        self.default_user_id: str = os.getenv('DEFAULT_USER_ID') or defaults.get('user_id', 'default_user')
+        self.default_extract_mode: str = defaults.get('extract_mode', 'auto')
+        self.batch_size: int = defaults.get('batch_size', 10)
+        
+        # File processing
+        self.supported_formats: list = file_processing.get('supported_formats', ['.md', '.txt'])
+        self.supported_extensions: FrozenSet[str] = frozenset(
+            ext.lower() if ext.startswith('.') else '.' + ext.lower() for ext in self.supported_formats
+        )
+        self.ignore_dirs: FrozenSet[str] = frozenset(file_processing.get('ignore_dirs', DEFAULT_IGNORE_DIRS))
+        self.max_file_size_mb: int = file_processing.get('max_file_size_mb', 10)
+        self.concurrent_upload: bool = file_processing.get('concurrent_upload', True)
+        self.max_concurrent_files: int = file_processing.get('max_concurrent_files', 3)
+        self.group_small_files: bool = file_processing.get('group_small_files', False)
+        self.max_batch_request_mb: int = file_processing.get('max_batch_request_mb', 20)
+        
+        # Search
+        self.search_default_limit: int = search.get('default_limit', 10)
+        self.search_max_limit: int = search.get('max_limit', 100)
+        self.search_cache_ttl_seconds: int = search.get('cache_ttl_seconds', 60)
+        
+        self.debug_logging: bool = config.get('debug', {}).get('enable_api_logging', True)
+        
+        # Message processing
+        self.message_batch_threshold: int = message_processing.get('batch_threshold', 10)
+        self.message_batch_size: int = message_processing.get('batch_size', 8)
+        self.enable_message_batching: bool = message_processing.get('enable_batching', True)
+        self.max_tokens_per_upload: int = message_processing.get('max_tokens_per_upload', 0)
+        
+        # Upload result cache
+        self.upload_cache_enabled: bool = upload_cache.get('enabled', True)
+        cache_env = os.getenv('MEM0_CLIENT_CACHE')
+        if cache_env:
+            self.upload_cache_enabled = cache_env.strip().lower() not in ('0', 'false', 'no', 'off')
+        self.upload_cache_path: str = upload_cache.get('path', '~/.mem0_client_cache.db')
+        self.upload_cache_ttl_days: int = upload_cache.get('ttl_days', 7)
+        self.upload_cache_max_distance: Optional[int] = upload_cache.get('max_distance', 3)
+        
+        # Advanced settings (persistent)
+        self.advanced_custom_instructions: str = advanced.get('custom_instructions', '')
+        self.advanced_includes: str = advanced.get('includes', '')
+        self.advanced_excludes: str = advanced.get('excludes', '')
+        self.advanced_exclude_presets: list = advanced.get('exclude_presets', [])
+        self.advanced_infer: bool = advanced.get('infer', True)
+        
+        self.time_presets: Mapping[str, int] = MappingProxyType(dict(config.get('time_presets', {})))
     
     def get_time_preset(self, preset_name: str) -> Optional[int]:
         """Get time preset value in days."""
-        return self.config.get('time_presets', {}).get(preset_name)
+        return self.time_presets.get(preset_name)
     
     def update_advanced_settings(self, **settings):
         """Update advanced settings and save to config file."""
@@ -134,6 +140,7 @@ class Config:
         
         # Save to file
         self._save_config()
+        self._load_settings()
     
     def _save_config(self):
         """Save current config to file."""
@@ -2,10 +2,84 @@
 
 import re
 import json
+import codecs
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, BinaryIO, Iterator, Optional, Tuple
 from datetime import datetime
 
+from .utils import JsonCodec
+
+# Optional: stream large JSON chat exports instead of loading them whole
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# JSON files above this size are streamed when ijson is installed
+_STREAM_JSON_BYTES = 5 * 1024 * 1024
+
+# JSON files above this size are parsed straight from their bytes
+_MAPPED_JSON_BYTES = 1024 * 1024
+
+# parse_file keeps recent results up to this many bytes of source files, so
+# a long-running process (the web app) never holds more than that in memory
+_PARSE_CACHE_BYTES = 64 * 1024 * 1024
+_parse_cache: "OrderedDict[Tuple[str, int, int, str], Tuple[int, Tuple[List[Dict[str, str]], Dict[str, Any]]]]" = OrderedDict()
+_parse_cache_bytes = 0
+_parse_cache_lock = threading.Lock()
+
+# Byte order marks and the codec that decodes (and drops) them; UTF-32 first
+# because its little-endian BOM starts with the UTF-16 one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+# Role header layouts tried in order by parse_markdown_chat; the first that
+# matches wins and each message runs from its header to the next one
+_MD_HEADER_PATTERNS = [
+    re.compile(pattern, re.MULTILINE) for pattern in (
+        # Pattern: **User:** or **Assistant:**
+        r'\*\*([^*]+):\*\*\s*',
+        # Pattern: ## User or ## Assistant
+        r'^##\s+([^#\n]+)\n',
+        # Pattern: User: or Assistant:
+        r'^([^:\n]+):\s*',
+        # Pattern: [User] or [Assistant]
+        r'\[([^\]]+)\]\s*',
+    )
+]
+
+# Substrings that mark a role name as the user; everything else is the assistant
+_USER_ROLE = re.compile('user|human|you|me|用户|我')
+
+# Common ASCII role names mapped straight to what the _USER_ROLE scan would
+# return, so the usual exports skip the regex
+_ROLE_ALIASES = {
+    "user": "user", "human": "user", "you": "user", "me": "user",
+    "assistant": "assistant", "system": "assistant", "ai": "assistant", "bot": "assistant",
+    "model": "assistant", "tool": "assistant", "function": "assistant",
+    "gpt": "assistant", "chatgpt": "assistant", "claude": "assistant", "gemini": "assistant",
+}
+
+# Any one of these marks content as a chat log; merged so the text is scanned once
+_CHAT_INDICATOR = re.compile(
+    '|'.join(f'(?:{pattern})' for pattern in (
+        r'\*\*[^*]+:\*\*',  # **User:** pattern
+        r'^##\s+[^#\n]+',   # ## User pattern
+        r'^[^:\n]+:\s',     # User: pattern
+        r'\[[^\]]+\]',      # [User] pattern
+        r'(?:user|assistant|human|ai|bot|gpt|claude)[\s:：]',  # Role words
+    )),
+    re.MULTILINE | re.IGNORECASE
+)
+
 
 class FileParser:
     """Parser for different file types and content formats."""
@@ -36,74 +110,159 @@ class FileParser:
             Tuple of (messages_list, metadata)
         """
         try:
-            data = json.loads(content)
+            data = JsonCodec.loads(content)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON format: {str(e)}")
         
+        return FileParser._parse_json_chat_data(data)
+    
+    @staticmethod
+    def _parse_json_chat_data(data: Any) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """Build messages and metadata from an already-decoded JSON chat."""
+        if not (isinstance(data, dict) and isinstance(data.get("messages"), list)):
+            raise ValueError("JSON must contain a 'messages' array")
+        
         messages = []
-        metadata = {}
+        for msg in data["messages"]:
+            message = FileParser._json_chat_message(msg)
+            if message is not None:
+                messages.append(message)
         
-        # Only extract conversation timestamps for JSON chats (useful for querying)
-        if "created" in data:
-            try:
-                # Convert timestamp to datetime
-                created_time = datetime.fromtimestamp(data["created"] / 1000)  # Assuming milliseconds
-                metadata["created"] = created_time.isoformat()
-            except (ValueError, TypeError):
-                metadata["created"] = str(data["created"])
-        if "updated" in data:
-            try:
-                updated_time = datetime.fromtimestamp(data["updated"] / 1000)  # Assuming milliseconds
-                metadata["updated"] = updated_time.isoformat()
-            except (ValueError, TypeError):
-                metadata["updated"] = str(data["updated"])
-        
-        # Parse messages
-        if "messages" in data and isinstance(data["messages"], list):
-            for msg in data["messages"]:
-                if not isinstance(msg, dict):
-                    continue
-                
-                # Extract role and content
-                role = msg.get("role", "user")  # Default to user if no role specified
-                content = msg.get("content", "")
-                
-                # Skip empty messages
-                if not content or not content.strip():
-                    continue
-                
-                # Normalize role (handles user, assistant, system, tool, etc.)
-                normalized_role = FileParser._normalize_role(role)
-                
-                # Skip assistant messages entirely - only keep user messages
-                # if normalized_role == "assistant":
-                #     continue
-                
-                # Handle long messages and problematic formatting
-                original_content = content.strip()
-                
-                # Since we only process user messages now, no special cleaning needed
-                cleaned_content = original_content
-                
-                # Handle length after cleaning
-                final_content = cleaned_content
-
-                # Build message - only include role and content for API compatibility
-                parsed_msg = {
-                    "role": normalized_role,
-                    "content": final_content
-                }
-                
-                messages.append(parsed_msg)
+        return FileParser._finish_json_chat(data, messages)
+    
+    @staticmethod
+    def _json_chat_message(msg: Any) -> Optional[Dict[str, str]]:
+        """
+        Normalize one record of a JSON chat's messages array.
         
-        else:
-            raise ValueError("JSON must contain a 'messages' array")
+        Shared by the full parse and the ijson stream so both keep and
+        convert records the same way.
         
+        Args:
+            msg: Decoded message record
+            
+        Returns:
+            {"role", "content"} message, or None to skip the record
+        """
+        if not isinstance(msg, dict):
+            return None
+        
+        # Extract role and content; only text content can be sent to Mem0
+        role = msg.get("role", "user")  # Default to user if no role specified
+        content = msg.get("content", "")
+        if not isinstance(content, str):
+            return None
+        if not isinstance(role, str):
+            role = "user"
+        
+        # Skip empty messages; most content has no edge whitespace to strip
+        if not content:
+            return None
+        if content[:1].isspace() or content[-1:].isspace():
+            content = content.strip()
+            if not content:
+                return None
+        
+        # Normalize role (handles user, assistant, system, tool, etc.)
+        normalized_role = _ROLE_ALIASES.get(role) or FileParser._normalize_role(role)
+        
+        # Skip assistant messages entirely - only keep user messages
+        # if normalized_role == "assistant":
+        #     return None
+        
+        # Build message - only include role and content for API compatibility
+        return {
+            "role": normalized_role,
+            "content": content
+        }
+    
+    @staticmethod
+    def _finish_json_chat(data: Dict[str, Any],
+                          messages: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """Check normalized messages and add the chat's timestamps as metadata."""
         if not messages:
             raise ValueError("No valid messages found in JSON")
         
+        # Only extract conversation timestamps for JSON chats (useful for querying)
+        metadata = {}
+        for key in ("created", "updated"):
+            if key in data:
+                metadata[key] = FileParser._ms_to_iso(data[key])
+        
         return messages, metadata
     
+    @staticmethod
+    def _ms_to_iso(value: Any) -> str:
+        """Convert a millisecond epoch timestamp to a local ISO string (str(value) if invalid)."""
+        try:
+            return datetime.fromtimestamp(value / 1000).isoformat()
+        except (ValueError, TypeError):
+            return str(value)
+    
+    @staticmethod
+    def _stream_json_chat(path: Path) -> Optional[Tuple[List[Dict[str, str]], Dict[str, Any]]]:
+        """
+        Parse a large JSON chat export with ijson, keeping only what is used.
+        
+        Only the top-level created/updated values and one message record at
+        a time are built as Python objects; each record is normalized with
+        _json_chat_message as soon as it is complete, like the full parse.
+        
+        Args:
+            path: Path to the JSON file
+            
+        Returns:
+            Tuple of (messages_list, metadata), or None if the file is not a
+            JSON chat that ijson can read (callers fall back to a full parse)
+        """
+        data = {}
+        messages = None
+        builder = None
+        builder_prefix = None
+        
+        f, encoding = FileParser.open_file(str(path))
+        try:
+            # ijson reads UTF-8 bytes; other encodings take the full parse
+            if encoding == 'utf-8-sig':
+                f.seek(len(codecs.BOM_UTF8))
+            elif encoding != 'utf-8':
+                return None
+            
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if builder is None:
+                    if prefix == 'messages':
+                        # The last "messages" key wins, as in a full parse
+                        if event == 'start_array':
+                            messages = []
+                        elif event not in ('end_array', 'end_map', 'map_key'):
+                            messages = None
+                        continue
+                    if not ((prefix == 'messages.item' and messages is not None) or
+                            prefix in ('created', 'updated')):
+                        continue
+                    builder = ijson.ObjectBuilder()
+                    builder_prefix = prefix
+                
+                builder.event(event, value)
+                # A value is complete at its own scalar or closing event
+                if prefix == builder_prefix and event not in ('start_map', 'start_array', 'map_key'):
+                    if builder_prefix == 'messages.item':
+                        message = FileParser._json_chat_message(builder.value)
+                        if message is not None:
+                            messages.append(message)
+                    else:
+                        data[builder_prefix] = builder.value
+                    builder = None
+        except Exception:
+            return None
+        finally:
+            f.close()
+        
+        if messages is None:
+            return None
+        
+        return FileParser._finish_json_chat(data, messages)
+    
     @staticmethod
     def parse_markdown_chat(content: str) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
         """
@@ -115,70 +274,66 @@ class FileParser:
         Returns:
             Tuple of (messages_list, metadata)
         """
-        messages = []
         metadata = {}  # No metadata needed for markdown chat
+        return list(FileParser.iter_markdown_chat(content)), metadata
+    
+    @staticmethod
+    def iter_markdown_chat(content: str) -> Iterator[Dict[str, str]]:
+        """
+        Yield markdown chat messages one at a time.
+        
+        Each message runs from its role header to the next header, so
+        multi-line bodies keep all their lines. Messages are sliced out of
+        content only when reached, so callers that consume them as they go
+        never hold them all at once.
+        
+        Args:
+            content: Raw markdown content
+            
+        Yields:
+            Message dicts with role and content
+        """
+        found = False
         
-        # Common patterns for chat logs
-        patterns = [
-            # Pattern: **User:** or **Assistant:**
-            r'\*\*([^*]+):\*\*\s*(.*?)(?=\*\*[^*]+:\*\*|$)',
-            # Pattern: ## User or ## Assistant
-            r'^##\s+([^#\n]+)\n(.*?)(?=^##\s+|$)',
-            # Pattern: User: or Assistant:
-            r'^([^:\n]+):\s*(.*?)(?=^[^:\n]+:|$)',
-            # Pattern: [User] or [Assistant]
-            r'\[([^\]]+)\]\s*(.*?)(?=\[[^\]]+\]|$)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, content, re.MULTILINE | re.DOTALL)
-            if matches:
-                for role_raw, message_content in matches:
-                    role = FileParser._normalize_role(role_raw.strip())
-                    content_clean = message_content.strip()
-                    if content_clean:
-                        messages.append({
-                            "role": role,
-                            "content": content_clean
-                        })
-                break
+        for pattern in _MD_HEADER_PATTERNS:
+            header = pattern.search(content)
+            if header is None:
+                continue
+            
+            # Look one header ahead to find where the current message ends
+            while header is not None:
+                next_header = pattern.search(content, header.end())
+                end = next_header.start() if next_header else len(content)
+                content_clean = content[header.end():end].strip()
+                if content_clean:
+                    found = True
+                    yield {
+                        "role": FileParser._normalize_role(header.group(1).strip()),
+                        "content": content_clean
+                    }
+                header = next_header
+            break
         
         # If no pattern matches, treat as single message
-        if not messages:
-            messages.append({
+        if not found:
+            yield {
                 "role": "user",  # Default to user for unstructured content
                 "content": content.strip()
-            })
-        
-        return messages, metadata
+            }
     
     @staticmethod
     def _normalize_role(role: str) -> str:
-        """Normalize role names to standard format."""
-        role_lower = role.lower().strip()
-        
-        # User aliases
-        if any(alias in role_lower for alias in ['user', 'human', 'you', 'me', '用户', '我']):
-            return "user"
-        
-        # Assistant aliases  
-        if any(alias in role_lower for alias in ['assistant', 'ai', 'bot', 'gpt', 'claude', 'chatgpt', '助手', '机器人']):
-            return "assistant"
-        
-        # looks like mem0 server only takes roles of user or assistant. other roles will encounter Bad request 400.
-        return "assistant"
-        
-        # System aliases
-        if any(alias in role_lower for alias in ['system', 'sys', '系统']):
-            return "system"
+        """
+        Normalize role names to standard format.
         
-        # Tool aliases
-        if any(alias in role_lower for alias in ['tool', 'function', 'api', 'service', '工具', '函数']):
-            return "tool"
-            
-        # Return original role if it doesn't match common patterns
-        # This preserves roles like "tool", "function", etc. that might be used as-is
-        return role_lower
+        Mem0 only accepts "user" and "assistant" (other roles get a 400 Bad
+        Request), so anything that is not a user alias maps to "assistant".
+        """
+        if role.isascii():
+            known = _ROLE_ALIASES.get(role.strip().lower())
+            if known:
+                return known
+        return "user" if _USER_ROLE.search(role.lower()) else "assistant"
     
     @staticmethod
     def parse_plain_text(content: str, extract_mode: str = "auto") -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
@@ -199,6 +354,31 @@ class FileParser:
         
         return messages, metadata
     
+    @staticmethod
+    def open_file(file_path: str) -> Tuple[BinaryIO, str]:
+        """
+        Open a file lazily for streaming consumers.
+        
+        Only the first bytes are read to sniff a byte order mark; the handle
+        is rewound so callers see the whole file. Wrap it in
+        io.TextIOWrapper(f, encoding) when text is needed.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            Tuple of (binary file handle, encoding); utf-8 when there is no BOM
+        """
+        try:
+            f = open(file_path, 'rb')
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        head = f.read(4)
+        f.seek(0)
+        encoding = next((enc for bom, enc in _BOMS if head.startswith(bom)), 'utf-8')
+        return f, encoding
+    
     @staticmethod
     def read_file(file_path: str, encoding: str = 'utf-8') -> str:
         """
@@ -211,21 +391,41 @@ class FileParser:
         Returns:
             File content as string
         """
-        path = Path(file_path)
-        
-        if not path.exists():
+        # Read once, then decode from memory
+        try:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
+        return FileParser.decode_bytes(raw, encoding, file_path)
+    
+    @staticmethod
+    def decode_bytes(raw: bytes, encoding: str = 'utf-8', source: str = "") -> str:
+        """
+        Decode file bytes to text.
         
-        # Try different encodings if utf-8 fails
-        encodings = [encoding, 'utf-8', 'gbk', 'gb2312', 'latin1']
+        A BOM settles the encoding, otherwise the usual candidates are tried in order.
         
-        for enc in encodings:
+        Args:
+            raw: File content
+            encoding: Preferred encoding (default: utf-8)
+            source: File name for the error message
+            
+        Returns:
+            Content as string with universal newlines
+        """
+        encodings = [enc for bom, enc in _BOMS if raw.startswith(bom)][:1]
+        encodings += [encoding, 'utf-8', 'gbk', 'gb2312', 'latin1']
+        
+        for enc in dict.fromkeys(encodings):
             try:
-                return path.read_text(encoding=enc)
+                text = raw.decode(enc)
             except UnicodeDecodeError:
                 continue
+            # Match read_text()'s universal newline handling
+            return text.replace('\r\n', '\n').replace('\r', '\n')
         
-        raise ValueError(f"Unable to decode file {file_path} with any supported encoding")
+        raise ValueError(f"Unable to decode file {source} with any supported encoding")
     
     @staticmethod
     def detect_content_type(content: str, file_extension: str = "") -> str:
@@ -239,36 +439,37 @@ class FileParser:
         Returns:
             Content type: "json_chat", "markdown_chat", or "plain_text"
         """
+        return FileParser._detect_content_type(content, file_extension)[0]
+    
+    @staticmethod
+    def _detect_content_type(content: str, file_extension: str = "") -> Tuple[str, Optional[Any]]:
+        """Detect the content type, also returning the decoded JSON for json_chat."""
         # Check if it's JSON first
         if file_extension.lower() == ".json" or content.strip().startswith('{'):
             try:
-                data = json.loads(content)
+                data = JsonCodec.loads(content)
                 # Check if it has the conversation structure
                 if isinstance(data, dict) and "messages" in data:
-                    return "json_chat"
+                    return "json_chat", data
             except json.JSONDecodeError:
                 pass
         
         # Look for conversation patterns in markdown/text
-        chat_indicators = [
-            r'\*\*[^*]+:\*\*',  # **User:** pattern
-            r'^##\s+[^#\n]+',   # ## User pattern
-            r'^[^:\n]+:\s',     # User: pattern
-            r'\[[^\]]+\]',      # [User] pattern
-            r'(user|assistant|human|ai|bot|gpt|claude)[\s:：]',  # Role words
-        ]
-        
-        for pattern in chat_indicators:
-            if re.search(pattern, content, re.MULTILINE | re.IGNORECASE):
-                return "markdown_chat"
-        
-        return "plain_text"
+        if _CHAT_INDICATOR.search(content):
+            return "markdown_chat", None
+        
+        return "plain_text", None
     
     @staticmethod
     def parse_file(file_path: str, extract_mode: str = "auto") -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
         """
         Parse any supported file type.
         
+        Results are cached per (path, mtime, size, extract_mode), so parsing
+        an unchanged file again is a lookup. The cache holds at most
+        _PARSE_CACHE_BYTES of source files, least recently used dropped
+        first. Callers get their own copies.
+        
         Args:
             file_path: Path to the file
             extract_mode: Processing mode for the content
@@ -276,30 +477,99 @@ class FileParser:
         Returns:
             Tuple of (messages_list, metadata)
         """
-        content = FileParser.read_file(file_path)
-        path = Path(file_path)
+        global _parse_cache_bytes
+        path = Path(file_path).absolute()
+        stat = path.stat()
+        # mtime and size are part of the key so edits invalidate the entry
+        key = (str(path), stat.st_mtime_ns, stat.st_size, extract_mode)
+        
+        with _parse_cache_lock:
+            entry = _parse_cache.get(key)
+            if entry is not None:
+                _parse_cache.move_to_end(key)
+        
+        if entry is None:
+            entry = (stat.st_size, FileParser._parse_path(path, stat.st_size, extract_mode))
+            if stat.st_size <= _PARSE_CACHE_BYTES:
+                with _parse_cache_lock:
+                    if key not in _parse_cache:
+                        _parse_cache[key] = entry
+                        _parse_cache_bytes += stat.st_size
+                    while _parse_cache_bytes > _PARSE_CACHE_BYTES:
+                        _, (evicted_size, _) = _parse_cache.popitem(last=False)
+                        _parse_cache_bytes -= evicted_size
+        
+        messages, metadata = entry[1]
+        return [dict(message) for message in messages], dict(metadata)
+    
+    @staticmethod
+    def _parse_path(path: Path, size: int, extract_mode: str) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """Parse a file without the cache; size is its size on disk."""
+        file_path = str(path)
+        
+        # Large JSON chats are streamed so only roles and contents are kept
+        if (ijson is not None and path.suffix.lower() == ".json" and
+                size > _STREAM_JSON_BYTES):
+            parsed = FileParser._stream_json_chat(path)
+            if parsed is not None:
+                messages, metadata = parsed
+                metadata["filename"] = path.name
+                return messages, metadata
+        
+        # Other large JSON chats skip decoding the whole file to str first
+        if path.suffix.lower() == ".json" and size > _MAPPED_JSON_BYTES:
+            try:
+                data = JsonCodec.load_file(file_path)
+            except (ValueError, OSError):
+                # BOMs, non-UTF-8 encodings and bad JSON take the text path
+                data = None
+            if isinstance(data, dict) and "messages" in data:
+                messages, metadata = FileParser._parse_json_chat_data(data)
+                metadata["filename"] = path.name
+                return messages, metadata
         
-        # Detect content type
-        content_type = FileParser.detect_content_type(content, path.suffix)
+        content = FileParser.read_file(file_path)
+        return FileParser.parse_content(content, path.name, extract_mode)
+    
+    @staticmethod
+    def parse_content(content: str, filename: str,
+                      extract_mode: str = "auto") -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """
+        Parse the decoded content of a file that is not on disk.
         
-        # Special handling: treat .md files as plain text unless they contain simple conversation patterns
-        if path.suffix.lower() == ".md":
-            # Check if this is a complex markdown document (like exported conversation)
-            # If it contains export metadata or is very long, treat as plain text
-            if ("Made with Echoes" in content or 
-                "This conversation was exported" in content or 
-                len(content) > 3000 or
-                content.count('\n') > 50):
-                content_type = "plain_text"
+        Args:
+            content: File content
+            filename: File name; its extension guides content detection
+            extract_mode: Processing mode for plain text
+            
+        Returns:
+            Tuple of (messages, metadata), like parse_file()
+        """
+        suffix = Path(filename).suffix
+        
+        # Treat .md files as plain text unless they contain simple conversation
+        # patterns. Complex markdown documents (like exported conversations with
+        # export metadata, or anything very long) are settled here, before any
+        # JSON or regex work; detect_content_type itself does not apply this
+        # file-upload rule. The length check comes first so the other scans
+        # only ever see short content
+        if suffix.lower() == ".md" and (len(content) > 3000 or
+                                        "Made with Echoes" in content or
+                                        "This conversation was exported" in content or
+                                        content.count('\n') > 50):
+            content_type, json_data = "plain_text", None
+        else:
+            # Detect content type (JSON chats come back already decoded)
+            content_type, json_data = FileParser._detect_content_type(content, suffix)
         
         if content_type == "json_chat":
-            messages, metadata = FileParser.parse_json_chat(content)
+            messages, metadata = FileParser._parse_json_chat_data(json_data)
         elif content_type == "markdown_chat":
             messages, metadata = FileParser.parse_markdown_chat(content)
         else:
             messages, metadata = FileParser.parse_plain_text(content, extract_mode)
         
         # Only add filename for file uploads
-        metadata["filename"] = path.name
+        metadata["filename"] = filename
         
         return messages, metadata 
\ No newline at end of file
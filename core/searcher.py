@@ -1,11 +1,14 @@
 """Search and retrieval functionality for Mem0 memories."""
 
-import os
-from typing import List, Dict, Any, Optional, Union
+import json
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta
-from mem0 import MemoryClient
 from rich.console import Console
 from .config import Config
+from .client import get_memory_client, memory_write_generation
 from .utils import (
     DebugLogger, FilterBuilder, DateTimeHelper, 
     ResultDisplayer, ApiParameterBuilder
@@ -13,6 +16,9 @@ from .utils import (
 
 console = Console()
 
+# Most distinct requests whose results are kept for reuse
+_RESULT_CACHE_SIZE = 256
+
 
 class MemorySearcher:
     """Handles searching and retrieving memories from Mem0."""
@@ -25,14 +31,19 @@ class MemorySearcher:
         if not self.config.validate():
             raise ValueError("Invalid configuration. Please check your API key.")
         
-        # Initialize Mem0 client
-        os.environ['MEM0_API_KEY'] = self.config.mem0_api_key
-        self.client = MemoryClient()
+        # Initialize Mem0 client (shared per API key)
+        self.client, created = get_memory_client(self.config.mem0_api_key)
         
         # Initialize debug logger
         self.logger = DebugLogger(self.config.debug_logging)
         
-        console.print(f"✅ Initialized Mem0 searcher for user: {self.config.default_user_id}")
+        # Recent API results keyed by request, reused within search.cache_ttl_seconds
+        # until the next upload; the web app shares this searcher across threads
+        self._result_cache: Dict[str, Tuple[float, int, Any]] = {}
+        self._result_cache_lock = threading.Lock()
+        
+        if created:
+            console.print(f"✅ Initialized Mem0 searcher for user: {self.config.default_user_id}")
     
     def search_by_query(self, 
                        query: str,
@@ -55,10 +66,7 @@ class MemorySearcher:
         limit = limit or self.config.search_default_limit
         
         try:
-            # Build filters using utility class
-            search_filters = FilterBuilder.build_user_filter(user_id)
-            if filters:
-                search_filters = FilterBuilder.add_additional_filters(search_filters, filters)
+            search_filters = self._build_filters(user_id, filters)
             
             # Log operation parameters
             self.logger.log_operation_params(
@@ -71,7 +79,7 @@ class MemorySearcher:
             self.logger.log_api_request("client.search", **api_params)
             
             # Search using Mem0 v2 API
-            results = self.client.search(**api_params)
+            results = self._cached_request("search", **api_params)
             
             # Log response
             self.logger.log_api_response("client.search", results)
@@ -135,14 +143,14 @@ class MemorySearcher:
                 api_params = ApiParameterBuilder.build_search_params(query, time_filter, limit)
                 self.logger.log_api_request("client.search with query", **api_params)
                 
-                results = self.client.search(**api_params)
+                results = self._cached_request("search", **api_params)
                 console.print(f"🔍 Found {len(results)} memories for '{query}' between {start_date} and {end_date}")
             else:
                 # Get all memories in time range
                 api_params = ApiParameterBuilder.build_get_all_params(time_filter, limit)
                 self.logger.log_api_request("client.get_all without query", **api_params)
                 
-                results = self.client.get_all(**api_params)
+                results = self._cached_request("get_all", **api_params)
                 console.print(f"[TIME] Found {len(results)} memories between {start_date} and {end_date}")
             
             # Log response
@@ -172,11 +180,13 @@ class MemorySearcher:
         today = datetime.now()
         week_start = today - timedelta(days=today.weekday() + (7 * weeks_back))
         week_end = week_start + timedelta(days=6)
+        week_start_str = week_start.strftime('%Y-%m-%d')
+        week_end_str = week_end.strftime('%Y-%m-%d')
         
         # Get memories from the target week
         week_memories = self.search_by_time_range(
-            start_date=week_start.strftime('%Y-%m-%d'),
-            end_date=week_end.strftime('%Y-%m-%d'),
+            start_date=week_start_str,
+            end_date=week_end_str,
             user_id=user_id,
             limit=self.config.search_max_limit
         )
@@ -184,8 +194,9 @@ class MemorySearcher:
         # Find related memories from history
         related_memories = []
         if week_memories:
-            # Extract key topics/themes from week memories
-            week_content = " ".join([m.get('memory', '') for m in week_memories[:5]])
+            # Extract key topics/themes from week memories; the query is capped
+            # at 500 chars, so no memory needs to contribute more than that
+            week_content = " ".join(m.get('memory', '')[:500] for m in week_memories[:5])
             
             # Search for related historical memories
             if week_content.strip():
@@ -193,14 +204,14 @@ class MemorySearcher:
                     query=week_content[:500],  # Limit query length
                     user_id=user_id,
                     limit=20,
-                    filters={"created_at": {"lt": week_start.strftime('%Y-%m-%d')}}
+                    filters={"created_at": {"lt": week_start_str}}
                 )
         
         console.print(f"📊 Weekly report data: {len(week_memories)} current week, {len(related_memories)} related")
         
         return {
-            "week_start": week_start.strftime('%Y-%m-%d'),
-            "week_end": week_end.strftime('%Y-%m-%d'),
+            "week_start": week_start_str,
+            "week_end": week_end_str,
             "week_memories": week_memories,
             "related_memories": related_memories,
             "summary": {
@@ -230,28 +241,26 @@ class MemorySearcher:
         limit = limit or self.config.search_default_limit
         
         try:
-            # Build filters
-            search_filters = {"AND": [{"user_id": user_id}]}
-            
             # Add time exclusion if specified
-            if exclude_time_range:
-                if "start" in exclude_time_range and "end" in exclude_time_range:
-                    search_filters["AND"].append({
-                        "NOT": [
-                            {"created_at": {
-                                "gte": exclude_time_range["start"],
-                                "lte": exclude_time_range["end"]
-                            }}
-                        ]
-                    })
+            exclusion = None
+            if exclude_time_range and "start" in exclude_time_range and "end" in exclude_time_range:
+                exclusion = {
+                    "NOT": [
+                        {"created_at": {
+                            "gte": exclude_time_range["start"],
+                            "lte": exclude_time_range["end"]
+                        }}
+                    ]
+                }
+            search_filters = self._build_filters(user_id, exclusion)
             
             # Search for related content
-            results = self.client.search(
-                query=content[:500],  # Limit query length
-                version="v2",
-                filters=search_filters,
-                top_k=limit
+            api_params = ApiParameterBuilder.build_search_params(
+                content[:500],  # Limit query length
+                search_filters,
+                limit
             )
+            results = self._cached_request("search", **api_params)
             
             console.print(f"[RELATED] Found {len(results)} memories related to the provided content")
             return results
@@ -260,13 +269,64 @@ class MemorySearcher:
             console.print(f"[ERROR] Related content search failed: {str(e)}")
             raise
     
-    def display_search_results(self, results: List[Dict[str, Any]], max_content_length: int = 100):
+    @staticmethod
+    def _build_filters(user_id: str, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build the user filter, with an optional extra condition ANDed on."""
+        return FilterBuilder.add_additional_filters(FilterBuilder.build_user_filter(user_id), extra)
+    
+    def _cached_request(self, method: str, **api_params) -> List[Dict[str, Any]]:
+        """
+        Call client.search or client.get_all, reusing a recent identical result.
+        
+        Reports and stats often repeat the same request within seconds; the
+        result is kept for search.cache_ttl_seconds (0 disables the cache),
+        and dropped as soon as an upload in this process adds memories.
+        
+        Args:
+            method: Client method name ("search" or "get_all")
+            **api_params: Parameters for the client call
+            
+        Returns:
+            Memories from the API or the cache, as a list or {"results": [...]}
+            like the client returns them
+        """
+        ttl = self.config.search_cache_ttl_seconds
+        if not ttl:
+            return getattr(self.client, method)(**api_params)
+        
+        key = json.dumps([method, api_params], sort_keys=True, default=str)
+        generation = memory_write_generation()
+        now = time.monotonic()
+        with self._result_cache_lock:
+            cached = self._result_cache.get(key)
+            if cached is not None and now - cached[0] < ttl and cached[1] == generation:
+                return self._copy_results(cached[2])
+        
+        # Request outside the lock so slow calls do not hold up other threads
+        results = getattr(self.client, method)(**api_params)
+        
+        with self._result_cache_lock:
+            # Drop the oldest entry once full (dicts keep insertion order)
+            self._result_cache.pop(key, None)
+            if len(self._result_cache) >= _RESULT_CACHE_SIZE:
+                del self._result_cache[next(iter(self._result_cache))]
+            self._result_cache[key] = (now, generation, results)
+        return self._copy_results(results)
+    
+    @staticmethod
+    def _copy_results(results: Any) -> Any:
+        """Copy a cached response so callers cannot change it, keeping its list or dict shape."""
+        if isinstance(results, dict):
+            return {key: list(value) if isinstance(value, list) else value for key, value in results.items()}
+        return list(results)
+    
+    def display_search_results(self, results: List[Dict[str, Any]], max_content_length: Optional[int] = 100):
         """
         Display search results in a formatted table.
         
         Args:
             results: List of memory results from search
-            max_content_length: Maximum length of content to display
+            max_content_length: Maximum length of content to display (None = full content)
         """
         ResultDisplayer.display_console_results(results, max_content_length)
     
@@ -284,7 +344,8 @@ class MemorySearcher:
         
         try:
             # Get all memories for the user
-            all_memories = self.client.get_all(
+            all_memories = self._cached_request(
+                "get_all",
                 version="v2",
                 filters={"user_id": user_id},
                 limit=1000  # Large limit to get comprehensive stats
@@ -293,32 +354,27 @@ class MemorySearcher:
             # Calculate stats
             total_memories = len(all_memories)
             
-            # Group by source
-            sources = {}
-            extract_modes = {}
-            
-            for memory in all_memories:
-                metadata = memory.get('metadata', {})
-                source = metadata.get('source', 'unknown')
-                extract_mode = metadata.get('extract_mode', 'unknown')
-                
-                sources[source] = sources.get(source, 0) + 1
-                extract_modes[extract_mode] = extract_modes.get(extract_mode, 0) + 1
+            # Group by source and extract mode (Mem0 returns null metadata for some memories)
+            metadatas = [memory.get('metadata') or {} for memory in all_memories]
+            sources = dict(Counter(metadata.get('source', 'unknown') for metadata in metadatas))
+            extract_modes = dict(Counter(metadata.get('extract_mode', 'unknown') for metadata in metadatas))
             
-            # Recent activity (last 7 days)
-            recent_memories = self.search_by_time_range(
-                days_back=7,
-                user_id=user_id,
-                limit=1000
+            # Recent activity (last 7 days), counted locally with the same
+            # updated_at >= start-of-day cutoff search_by_time_range uses
+            now = datetime.now()
+            cutoff = (now - timedelta(days=7)).strftime('%Y-%m-%d')
+            recent_count = sum(
+                1 for memory in all_memories
+                if (memory.get('updated_at') or memory.get('created_at') or '')[:10] >= cutoff
             )
             
             stats = {
                 "user_id": user_id,
                 "total_memories": total_memories,
-                "recent_memories_7d": len(recent_memories),
+                "recent_memories_7d": recent_count,
                 "sources": sources,
                 "extract_modes": extract_modes,
-                "generated_at": datetime.now().isoformat()
+                "generated_at": now.isoformat()
             }
             
             return stats
@@ -1,15 +1,21 @@
 """Upload and memory management with Mem0 API."""
 
+import atexit
+import hashlib
+import logging
 import os
+import queue
 import time
-import asyncio
 import concurrent.futures
-from typing import List, Dict, Any, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Dict, Any, BinaryIO, Callable, Iterator, Optional, Tuple, Union
 from datetime import datetime
-from mem0 import MemoryClient
 from rich.console import Console
-from rich.progress import Progress, TaskID
+from rich.logging import RichHandler
+from rich.progress import Progress
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from .cache import UploadCache, simhash64
+from .client import get_memory_client, _record_memory_write
 from .config import Config
 from .parser import FileParser
 from .utils import (
@@ -19,6 +25,49 @@ from .utils import (
 
 console = Console()
 
+# Per-upload progress lines go through this logger. Records are queued and a
+# background listener renders them, so upload workers never wait on Rich's
+# console lock; summaries stay on console.print.
+logger = logging.getLogger("mem0client")
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_log_listener: Optional[QueueListener] = None
+
+
+def _configure_logger():
+    """Attach the queue handler and start its Rich listener (once per process)."""
+    global _log_listener
+    if _log_listener is not None or logger.handlers:
+        return
+    
+    handler = RichHandler(console=console, markup=False, rich_tracebacks=False,
+                          show_time=False, show_level=False, show_path=False)
+    _log_listener = QueueListener(_log_queue, handler)
+    _log_listener.start()
+    atexit.register(_stop_logger)
+    
+    logger.addHandler(QueueHandler(_log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _stop_logger():
+    """Render what is left in the queue and stop the listener at exit."""
+    global _log_listener
+    listener, _log_listener = _log_listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def _flush_log():
+    """
+    Wait until every queued log record is rendered, before printing to the console directly.
+    
+    The listener marks each record done, so this only waits and never stops
+    or restarts it; concurrent callers (web batch threads) are safe.
+    """
+    if _log_listener is not None:
+        _log_queue.join()
+
 
 class MemoryUploader:
     """Handles uploading and managing memories with Mem0."""
@@ -31,14 +80,111 @@ class MemoryUploader:
         if not self.config.validate():
             raise ValueError("Invalid configuration. Please check your API key.")
         
-        # Initialize Mem0 client
-        os.environ['MEM0_API_KEY'] = self.config.mem0_api_key
-        self.client = MemoryClient()
+        # Initialize Mem0 client (shared per API key)
+        self.client, created = get_memory_client(self.config.mem0_api_key)
         
         # Initialize debug logger
         self.logger = DebugLogger(self.config.debug_logging)
+        _configure_logger()
+        
+        # Remember finished uploads so identical content is not sent twice
+        self.upload_cache = None
+        if self.config.upload_cache_enabled:
+            self.upload_cache = UploadCache(self.config.upload_cache_path, self.config.upload_cache_ttl_days,
+                                            self.config.upload_cache_max_distance)
+        
+        if created:
+            console.print(f"✅ Initialized Mem0 client for user: {self.config.default_user_id}")
+    
+    def ping(self, user_id: Optional[str] = None, timeout: float = 2.0) -> bool:
+        """
+        Check that the API answers a minimal memory read for a user.
+
+        Args:
+            user_id: User ID to read for (defaults to config)
+            timeout: Seconds to wait for the response
+
+        Returns:
+            True if the request succeeded, False otherwise
+        """
+        user_id = user_id or self.config.default_user_id
+        
+        # The SDK builds the request (org/project params, endpoint); the short
+        # limit is enforced from outside so the shared client keeps its own
+        # 300s timeout. A timed-out read finishes in the background.
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        try:
+            executor.submit(
+                self.client.get_all, filters={"user_id": user_id}, page=1, page_size=1
+            ).result(timeout=timeout)
+            return True
+        except Exception as e:
+            if self.logger.enable_debug:
+                console.print(f"[DEBUG] ping failed: {str(e) or type(e).__name__}")
+            return False
+        finally:
+            executor.shutdown(wait=False)
+    
+    @staticmethod
+    def _progress() -> Progress:
+        """
+        Create a progress bar for batch uploads.
+        
+        Redraws are capped at 5 per second however fast files finish, the bar
+        clears itself when done, and it is skipped entirely when output is
+        not a terminal (pipes, logs, the web app).
+        """
+        return Progress(console=console, refresh_per_second=5, transient=True,
+                        disable=not console.is_terminal)
+    
+    def _cache_entry(self, content_digest: str, text: str, source: str,
+                     **params) -> Optional[Tuple[str, int, str, str]]:
+        """Build the (key, simhash, params_key, source) cache entry for an upload, or None when caching is off."""
+        if self.upload_cache is None:
+            return None
+        return (UploadCache.make_key(content_digest, **params), simhash64(text),
+                UploadCache.params_key(**params), source)
+    
+    def _cached_result(self, entry: Optional[Tuple[str, int, str, str]]) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached result for an entry marked with cached=True, or None on a miss.
+        
+        A near-duplicate hit belongs to another upload, so only the match is
+        reported (cached=True, near_duplicate_of=<its file name or text
+        preview>) instead of passing that upload's result off as this one's.
+        """
+        if entry is None:
+            return None
+        
+        hit = self.upload_cache.lookup(entry[0], entry[1], entry[2])
+        if hit is None:
+            return None
+        result, near_duplicate_of = hit
+        if near_duplicate_of is not None:
+            return {"cached": True, "near_duplicate_of": near_duplicate_of}
+        return dict(result, cached=True) if isinstance(result, dict) else {"cached": True, "results": result}
+    
+    def _store_result(self, entry: Optional[Tuple[str, int, str, str]], result: Dict[str, Any]):
+        """Remember a finished upload, unless any part of it failed so a retry still uploads."""
+        if entry is None:
+            return
+        if isinstance(result, dict) and (result.get("failed") or result.get("failed_batches")):
+            return
+        self.upload_cache.set(entry[0], result, entry[1], entry[2], source=entry[3])
+    
+    def clear_cache(self, expired_only: bool = False) -> int:
+        """
+        Forget previous uploads so the next upload of any content reaches Mem0.
         
-        console.print(f"✅ Initialized Mem0 client for user: {self.config.default_user_id}")
+        Args:
+            expired_only: Only drop entries older than upload_cache.ttl_days
+            
+        Returns:
+            Number of cache entries removed (0 when the cache is disabled)
+        """
+        if self.upload_cache is None:
+            return 0
+        return self.upload_cache.clear(expired_only)
     
     def _is_retryable_error(self, exception: Exception) -> bool:
         """Check if an error should be retried."""
@@ -62,6 +208,7 @@ class MemoryUploader:
             console.print("🔄 Attempting API call to Mem0...")
         
         result = self.client.add(messages, **kwargs)
+        _record_memory_write()
         
         if self.config.debug_logging:
             console.print("✅ API call successful")
@@ -78,10 +225,16 @@ class MemoryUploader:
                    excludes: Optional[str] = None,
                    infer: Optional[bool] = None,
                    batch_size: Optional[int] = None,
-                   disable_batching: bool = False) -> Dict[str, Any]:
+                   disable_batching: bool = False,
+                   force: bool = False) -> Dict[str, Any]:
         """
         Upload text content to Mem0.
         
+        Identical or near-identical text already uploaded with the same
+        settings is not sent again. An identical upload returns the earlier
+        result with cached=True; a near-identical one returns only
+        cached=True and near_duplicate_of.
+        
         Args:
             content: Text content to upload
             user_id: User ID for the memory (defaults to config)
@@ -93,103 +246,155 @@ class MemoryUploader:
             infer: Whether to infer memories (True) or store raw messages (False)
             batch_size: Number of messages per batch (optional)
             disable_batching: Whether to disable batch processing
+            force: Upload even if the upload cache has a matching entry
             
         Returns:
             Upload result from Mem0
         """
         user_id = user_id or self.config.default_user_id
         
-        # Parse content
-        messages, parsed_metadata = FileParser.parse_plain_text(content, extract_mode)
+        preview = MessageProcessor.truncate_content_preview(" ".join(content.split()), 40)
+        cache_entry = self._cache_entry(
+            UploadCache.text_digest(content), content, f"text '{preview}'",
+            user_id=user_id, extract_mode=extract_mode, metadata=metadata,
+            custom_instructions=custom_instructions, includes=includes, excludes=excludes, infer=infer
+        )
+        if not force:
+            cached = self._cached_result(cache_entry)
+            if cached is not None:
+                console.print(f"♻️  Skipped text already uploaded for user: {user_id}")
+                return cached
         
-        # For text uploads, no metadata needed (as per user request)
-        final_metadata = metadata or {}
-        
-        # Determine effective batch settings
-        effective_batch_size = batch_size or self.config.message_batch_size
-        use_batching = (not disable_batching and 
-                       self.config.enable_message_batching and 
-                       len(messages) > self.config.message_batch_threshold)
+        messages, _ = self._prepare_from_text(content, extract_mode)
         
         try:
-            # Prepare additional parameters for Mem0 using utility
-            add_params = ApiParameterBuilder.build_upload_params(
+            # For text uploads, no metadata needed (as per user request)
+            result = self._upload_prepared(
+                messages, metadata or {},
                 user_id=user_id,
                 custom_instructions=custom_instructions,
                 includes=includes,
                 excludes=excludes,
                 infer=infer,
-                metadata=final_metadata
+                batch_size=batch_size,
+                disable_batching=disable_batching
             )
             
-            # Log the parameters being sent to Mem0 (if debug enabled)
-            if self.logger.enable_debug:
-                console.print("\n🔍 [DEBUG] Mem0.add() 调用参数:")
-                console.print(f"  📱 user_id: {user_id}")
-                console.print(f"  📦 batch_processing: {use_batching}")
-                if use_batching:
-                    console.print(f"  📏 batch_size: {effective_batch_size}")
-                
-                # Log messages using utility
-                MessageProcessor.log_messages_debug(messages, self.logger)
-                
-                # Log custom processing parameters
-                if custom_instructions:
-                    instr_preview = MessageProcessor.truncate_content_preview(custom_instructions, 50)
-                    console.print(f"  🎯 custom_instructions: '{instr_preview}'")
-                if includes:
-                    console.print(f"  ✅ includes: '{includes}'")
-                if excludes:
-                    console.print(f"  ❌ excludes: '{excludes}'")
-                if infer is not None:
-                    console.print(f"  🧠 infer: {infer}")
-                
-                # Log metadata using utility
-                MessageProcessor.log_metadata_debug(final_metadata, self.logger)
-                console.print("")
-            
-            # Add to Mem0 (messages as first positional argument)
-            if use_batching:
-                # Use batch processing for long message lists
-                console.print(f"🔄 Message count ({len(messages)}) exceeds threshold ({self.config.message_batch_threshold}), using batch processing")
-                
-                results = self._upload_messages_in_batches(
-                    messages=messages,
-                    user_id=user_id,
-                    add_params=add_params,
-                    batch_size=effective_batch_size,
-                    metadata=final_metadata
-                )
-                
-                # Return summary of batch results
-                successful_batches = [r for r in results if not r.get("failed", False)]
-                failed_batches = [r for r in results if r.get("failed", False)]
-                
-                result = {
-                    "batch_processing": True,
-                    "total_batches": len(results),
-                    "successful_batches": len(successful_batches),
-                    "failed_batches": len(failed_batches),
-                    "batch_results": results
-                }
-                
-                if successful_batches:
-                    # Use the first successful result as primary
-                    result.update(successful_batches[0])
-                
-            else:
-                # Direct upload for shorter message lists
-                result = self._add_with_retry(messages, **add_params)
+            self._store_result(cache_entry, result)
             
-            console.print(f"✅ Uploaded text memory for user: {user_id}")
+            logger.info("✅ Uploaded text memory for user: %s", user_id)
             if custom_instructions or includes or excludes or infer is not None:
-                console.print(f"📋 Applied custom processing settings")
+                logger.info("📋 Applied custom processing settings")
             return result
             
         except Exception as e:
             console.print(f"❌ Failed to upload text: {str(e)}")
             raise
     
+    def _prepare_from_text(self, content: str, extract_mode: str = "auto") -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """
+        Parse text into messages once, so several uploads can share the result.
+        
+        Args:
+            content: Text content to parse
+            extract_mode: Processing mode ("auto" or "raw")
+            
+        Returns:
+            Tuple of (messages, parsed metadata)
+        """
+        return FileParser.parse_plain_text(content, extract_mode)
+    
+    def _upload_prepared(self,
+                         messages: List[Dict[str, str]],
+                         base_metadata: Optional[Dict[str, Any]] = None,
+                         user_id: Optional[str] = None,
+                         custom_instructions: Optional[str] = None,
+                         includes: Optional[str] = None,
+                         excludes: Optional[str] = None,
+                         infer: Optional[bool] = None,
+                         batch_size: Optional[int] = None,
+                         disable_batching: bool = False) -> Dict[str, Any]:
+        """
+        Upload already parsed messages to Mem0.
+        
+        Lets callers comparing settings (e.g. infer=True vs False) parse the
+        content once with _prepare_from_text() and upload it repeatedly.
+        The upload cache is not consulted.
+        
+        Args:
+            messages: Messages from _prepare_from_text()
+            base_metadata: Metadata stored with the memory
+            user_id: User ID for the memory (defaults to config)
+            custom_instructions: Custom instructions for AI processing
+            includes: Content types to specifically include
+            excludes: Content types to exclude from processing
+            infer: Whether to infer memories (True) or store raw messages (False)
+            batch_size: Number of messages per batch (optional)
+            disable_batching: Whether to disable batch processing
+            
+        Returns:
+            Upload result from Mem0
+        """
+        # Determine effective batch settings
+        effective_batch_size = batch_size or self.config.message_batch_size
+        use_batching = (not disable_batching and 
+                       self.config.enable_message_batching and 
+                       len(messages) > self.config.message_batch_threshold)
+        
+        # Prepare additional parameters for Mem0 using utility
+        add_params = ApiParameterBuilder.build_upload_params(
+            user_id=user_id or self.config.default_user_id,
+            custom_instructions=custom_instructions,
+            includes=includes,
+            excludes=excludes,
+            infer=infer,
+            metadata=base_metadata or {}
+        )
+        
+        self._log_add_params(add_params, messages, use_batching, effective_batch_size)
+        
+        return self._add_messages(messages, add_params, use_batching, effective_batch_size)
+    
+    def upload_texts(self,
+                     items: List[Dict[str, Any]],
+                     user_id: Optional[str] = None,
+                     extract_mode: str = "auto",
+                     concurrent_upload: Optional[bool] = None,
+                     **upload_kwargs) -> List[Dict[str, Any]]:
+        """
+        Upload several independent texts, overlapping their requests.
+        
+        Mem0 has no bulk add endpoint, so each text is still its own add()
+        call (keeping its own metadata), but the calls run concurrently on
+        up to max_concurrent_files threads instead of one after another.
+        
+        Args:
+            items: Dicts with "content" and optional "metadata"
+            user_id: User ID for the memories (defaults to config)
+            extract_mode: Processing mode ("auto" or "raw")
+            concurrent_upload: Whether to upload concurrently (None = use config default)
+            **upload_kwargs: Further upload_text options shared by every item
+            
+        Returns:
+            One {"status", "result" or "error"} dict per item, in input order
+        """
+        user_id = user_id or self.config.default_user_id
+        use_concurrent = concurrent_upload if concurrent_upload is not None else self.config.concurrent_upload
+        
+        def upload_item(item: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                result = self.upload_text(item["content"], user_id=user_id, extract_mode=extract_mode,
+                                          metadata=item.get("metadata"), **upload_kwargs)
+                return {"status": "success", "result": result}
+            except Exception as e:
+                return {"status": "error", "error": str(e)}
+        
+        if use_concurrent and len(items) > 1:
+            max_workers = min(self.config.max_concurrent_files, len(items))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(upload_item, items))
+        return [upload_item(item) for item in items]
+    
     def upload_file(self, 
                    file_path: str,
                    user_id: Optional[str] = None,
@@ -199,10 +404,17 @@ class MemoryUploader:
                    excludes: Optional[str] = None,
                    infer: Optional[bool] = None,
                    batch_size: Optional[int] = None,
-                   disable_batching: bool = False) -> Dict[str, Any]:
+                   disable_batching: bool = False,
+                   force: bool = False,
+                   digest: Optional[str] = None) -> Dict[str, Any]:
         """
         Upload a file to Mem0.
         
+        A file whose content was already uploaded (exactly or nearly) under
+        the same name and settings is not sent again. An identical upload
+        returns the earlier result with cached=True; a near-identical one
+        returns only cached=True and near_duplicate_of.
+        
         Args:
             file_path: Path to the file
             user_id: User ID for the memory (defaults to config)
@@ -213,6 +425,9 @@ class MemoryUploader:
             infer: Whether to infer memories (True) or store raw messages (False)
             batch_size: Number of messages per batch (optional)
             disable_batching: Whether to disable batch processing
+            force: Upload even if the upload cache has a matching entry
+            digest: The file's UploadCache.file_digest() if the caller already
+                has it, so the file is not hashed again
             
         Returns:
             Upload result from Mem0
@@ -220,13 +435,19 @@ class MemoryUploader:
         user_id = user_id or self.config.default_user_id
         extract_mode = extract_mode or self.config.default_extract_mode
         
-        # Validate file
-        if not os.path.exists(file_path):
+        # Validate file and fingerprint it for the upload cache in one open
+        try:
+            f = open(file_path, 'rb')
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
-        if file_size_mb > self.config.max_file_size_mb:
-            raise ValueError(f"File too large: {file_size_mb:.1f}MB > {self.config.max_file_size_mb}MB")
+        with f:
+            file_size_mb = os.fstat(f.fileno()).st_size / (1024 * 1024)
+            if file_size_mb > self.config.max_file_size_mb:
+                raise ValueError(f"File too large: {file_size_mb:.1f}MB > {self.config.max_file_size_mb}MB")
+            content_digest = digest
+            if content_digest is None and self.upload_cache is not None:
+                content_digest = UploadCache.stream_digest(f)
         
         # Parse file
         try:
@@ -235,6 +456,102 @@ class MemoryUploader:
             console.print(f"❌ Failed to parse file {file_path}: {str(e)}")
             raise
         
+        return self._upload_parsed_file(
+            messages, metadata, file_path, os.path.basename(file_path), content_digest,
+            user_id=user_id, extract_mode=extract_mode,
+            custom_instructions=custom_instructions, includes=includes, excludes=excludes, infer=infer,
+            batch_size=batch_size, disable_batching=disable_batching, force=force
+        )
+    
+    def upload_fileobj(self,
+                       fileobj: BinaryIO,
+                       filename: str,
+                       user_id: Optional[str] = None,
+                       extract_mode: Optional[str] = None,
+                       custom_instructions: Optional[str] = None,
+                       includes: Optional[str] = None,
+                       excludes: Optional[str] = None,
+                       infer: Optional[bool] = None,
+                       batch_size: Optional[int] = None,
+                       disable_batching: bool = False,
+                       force: bool = False) -> Dict[str, Any]:
+        """
+        Upload an open binary file (e.g. a web upload) without saving it to disk.
+        
+        Parsed and cached like upload_file(), keyed on filename. Mem0 takes
+        parsed messages rather than a raw request body, so the content is
+        read into memory once and parsed from there.
+        
+        Args:
+            fileobj: Binary file object, read from its start
+            filename: Original file name; its extension guides parsing
+            user_id: User ID for the memory (defaults to config)
+            extract_mode: Processing mode (defaults to config)
+            custom_instructions: Custom instructions for AI processing
+            includes: Content types to specifically include
+            excludes: Content types to exclude from processing
+            infer: Whether to infer memories (True) or store raw messages (False)
+            batch_size: Number of messages per batch (optional)
+            disable_batching: Whether to disable batch processing
+            force: Upload even if the upload cache has a matching entry
+            
+        Returns:
+            Upload result from Mem0
+        """
+        user_id = user_id or self.config.default_user_id
+        extract_mode = extract_mode or self.config.default_extract_mode
+        
+        fileobj.seek(0)
+        raw = fileobj.read()
+        file_size_mb = len(raw) / (1024 * 1024)
+        if file_size_mb > self.config.max_file_size_mb:
+            raise ValueError(f"File too large: {file_size_mb:.1f}MB > {self.config.max_file_size_mb}MB")
+        content_digest = hashlib.sha256(raw).hexdigest() if self.upload_cache is not None else None
+        
+        try:
+            content = FileParser.decode_bytes(raw, source=filename)
+            del raw
+            messages, metadata = FileParser.parse_content(content, filename, extract_mode)
+        except Exception as e:
+            console.print(f"❌ Failed to parse file {filename}: {str(e)}")
+            raise
+        
+        return self._upload_parsed_file(
+            messages, metadata, filename, filename, content_digest,
+            user_id=user_id, extract_mode=extract_mode,
+            custom_instructions=custom_instructions, includes=includes, excludes=excludes, infer=infer,
+            batch_size=batch_size, disable_batching=disable_batching, force=force
+        )
+    
+    def _upload_parsed_file(self,
+                            messages: List[Dict[str, str]],
+                            metadata: Dict[str, Any],
+                            file_path: str,
+                            filename: str,
+                            content_digest: Optional[str],
+                            user_id: str,
+                            extract_mode: str,
+                            custom_instructions: Optional[str] = None,
+                            includes: Optional[str] = None,
+                            excludes: Optional[str] = None,
+                            infer: Optional[bool] = None,
+                            batch_size: Optional[int] = None,
+                            disable_batching: bool = False,
+                            force: bool = False) -> Dict[str, Any]:
+        """Check the upload cache, then send a parsed file's messages to Mem0."""
+        cache_entry = None
+        if content_digest is not None:
+            cache_entry = self._cache_entry(
+                content_digest, " ".join(msg["content"] for msg in messages), file_path,
+                user_id=user_id, extract_mode=extract_mode, filename=filename,
+                custom_instructions=custom_instructions, includes=includes, excludes=excludes, infer=infer
+            )
+        if not force:
+            cached = self._cached_result(cache_entry)
+            if cached is not None:
+                console.print(f"♻️  Skipped file already uploaded: {file_path}")
+                return cached
+        
         # For file uploads, only keep filename and timestamps (for JSON chats)
         # No need for upload_time, user_id, extract_mode etc.
         
@@ -250,7 +567,6 @@ class MemoryUploader:
             if metadata and "updated" in metadata:
                 try:
                     # Convert updated timestamp (ISO format) to Unix timestamp
-                    from datetime import datetime
                     dt = datetime.fromisoformat(metadata["updated"].replace('Z', '+00:00'))
                     timestamp = int(dt.timestamp())
                     console.print(f"🕐 Using timestamp from file: {metadata['updated']} (Unix: {timestamp})")
@@ -268,98 +584,121 @@ class MemoryUploader:
                 timestamp=timestamp
             )
             
-            # Log the parameters being sent to Mem0 (if debug enabled)
-            if self.config.debug_logging:
-                console.print(f"\n🔍 [DEBUG] Mem0.add() 调用参数 (文件: {os.path.basename(file_path)}):")
-                console.print(f"  📱 user_id: {user_id}")
-                console.print(f"  📦 batch_processing: {use_batching}")
-                if use_batching:
-                    console.print(f"  📏 batch_size: {effective_batch_size}")
-                
-                # Log messages with truncation
-                if messages:
-                    for i, msg in enumerate(messages[:3]):  # Show first 3 messages
-                        if isinstance(msg, dict) and 'content' in msg:
-                            content_preview = msg['content'][:20] + "..." if len(msg['content']) > 20 else msg['content']
-                            role = msg.get('role', 'unknown')
-                            console.print(f"  💬 messages[{i}]: role='{role}', content='{content_preview}'")
-                        elif isinstance(msg, str):
-                            content_preview = msg[:20] + "..." if len(msg) > 20 else msg
-                            console.print(f"  💬 messages[{i}]: '{content_preview}'")
-                    if len(messages) > 3:
-                        console.print(f"  💬 ... and {len(messages) - 3} more messages")
-                
-                # Log custom processing parameters
-                if custom_instructions:
-                    instr_preview = custom_instructions[:50] + "..." if len(custom_instructions) > 50 else custom_instructions
-                    console.print(f"  🎯 custom_instructions: '{instr_preview}'")
-                if includes:
-                    console.print(f"  ✅ includes: '{includes}'")
-                if excludes:
-                    console.print(f"  ❌ excludes: '{excludes}'")
-                if infer is not None:
-                    console.print(f"  🧠 infer: {infer}")
-                if timestamp is not None:
-                    console.print(f"  🕐 timestamp: {timestamp}")
-                
-                # Log metadata (excluding lengthy fields)
-                metadata_summary = {}
-                for key, value in metadata.items():
-                    if key in ['upload_time', 'user_id', 'extract_mode', 'file_name', 'file_type']:
-                        metadata_summary[key] = value
-                    elif isinstance(value, str) and len(value) > 30:
-                        metadata_summary[key] = value[:30] + "..."
-                    else:
-                        metadata_summary[key] = value
-                console.print(f"  📋 metadata: {metadata_summary}")
-                console.print("")
+            self._log_add_params(add_params, messages, use_batching, effective_batch_size,
+                                 source=filename)
             
-            # Add to Mem0 (messages as first positional argument)
-            try:
-                if use_batching:
-                    # Use batch processing for long message lists
-                    console.print(f"🔄 Message count ({len(messages)}) exceeds threshold ({self.config.message_batch_threshold}), using batch processing")
-                    
-                    results = self._upload_messages_in_batches(
-                        messages=messages,
-                        user_id=user_id,
-                        add_params=add_params,
-                        batch_size=effective_batch_size,
-                        metadata=metadata
-                    )
-                    
-                    # Return summary of batch results
-                    successful_batches = [r for r in results if not r.get("failed", False)]
-                    failed_batches = [r for r in results if r.get("failed", False)]
-                    
-                    result = {
-                        "batch_processing": True,
-                        "total_batches": len(results),
-                        "successful_batches": len(successful_batches),
-                        "failed_batches": len(failed_batches),
-                        "batch_results": results
-                    }
-                    
-                    if successful_batches:
-                        # Use the first successful result as primary
-                        result.update(successful_batches[0])
-                        
-                else:
-                    # Direct upload for shorter message lists
-                    result = self._add_with_retry(messages, **add_params)
-                
-                console.print(f"✅ Uploaded file: {file_path} for user: {user_id}")
-                if custom_instructions or includes or excludes or infer is not None:
-                    console.print(f"📋 Applied custom processing settings")
-                return result
-                
-            except Exception as api_error:
-                raise api_error
+            result = self._add_messages(messages, add_params, use_batching, effective_batch_size)
+            
+            self._store_result(cache_entry, result)
+            
+            logger.info("✅ Uploaded file: %s for user: %s", file_path, user_id)
+            if custom_instructions or includes or excludes or infer is not None:
+                logger.info("📋 Applied custom processing settings")
+            return result
             
         except Exception as e:
             console.print(f"❌ Failed to upload file {file_path}: {str(e)}")
             raise
     
+    def _log_add_params(self,
+                        add_params: Dict[str, Any],
+                        messages: List[Dict[str, str]],
+                        use_batching: bool,
+                        batch_size: int,
+                        source: Optional[str] = None):
+        """Print the parameters about to be sent to Mem0.add() in one call (debug logging only)."""
+        if not self.logger.enable_debug:
+            return
+        
+        header = "\n🔍 [DEBUG] Mem0.add() 调用参数" + (f" (文件: {source}):" if source else ":")
+        lines = [header, f"  📱 user_id: {add_params['user_id']}", f"  📦 batch_processing: {use_batching}"]
+        if use_batching:
+            lines.append(f"  📏 batch_size: {batch_size}")
+        
+        lines.extend(MessageProcessor.format_messages_debug(messages))
+        
+        # Custom processing parameters
+        if add_params.get("custom_instructions"):
+            instr_preview = MessageProcessor.truncate_content_preview(add_params["custom_instructions"], 50)
+            lines.append(f"  🎯 custom_instructions: '{instr_preview}'")
+        if add_params.get("includes"):
+            lines.append(f"  ✅ includes: '{add_params['includes']}'")
+        if add_params.get("excludes"):
+            lines.append(f"  ❌ excludes: '{add_params['excludes']}'")
+        if "infer" in add_params:
+            lines.append(f"  🧠 infer: {add_params['infer']}")
+        if "timestamp" in add_params:
+            lines.append(f"  🕐 timestamp: {add_params['timestamp']}")
+        
+        lines.append(MessageProcessor.format_metadata_debug(add_params.get("metadata") or {}))
+        lines.append("")
+        # Previews are user content: skip markup parsing and highlighting
+        console.print("\n".join(lines), markup=False, highlight=False, soft_wrap=True)
+    
+    def _add_messages(self,
+                      messages: List[Dict[str, str]],
+                      add_params: Dict[str, Any],
+                      use_batching: bool,
+                      batch_size: int) -> Dict[str, Any]:
+        """
+        Send messages to Mem0, in incremental batches for long message lists.
+        
+        Returns:
+            The add() result, or a batch summary when batching was used
+        """
+        max_tokens = self.config.max_tokens_per_upload
+        if max_tokens:
+            # Preflight: a message that cannot fit fails here, before any request,
+            # and uploads over the budget go out in chunks split on message boundaries
+            chunks = MessageProcessor.split_by_tokens(messages, max_tokens)
+            if len(chunks) > 1:
+                console.print(f"✂️  Upload exceeds {max_tokens} tokens, sending it in {len(chunks)} chunks")
+                results = []
+                for chunk_num, chunk in enumerate(chunks, 1):
+                    try:
+                        results.append(self._add_with_retry(chunk, **add_params))
+                    except Exception as e:
+                        console.print(f"❌ Failed to upload chunk {chunk_num}/{len(chunks)}: {str(e)}")
+                        results.append({"error": str(e), "batch_number": chunk_num, "failed": True})
+                return self._summarize_batches(results)
+        
+        if not use_batching:
+            # Direct upload for shorter message lists
+            return self._add_with_retry(messages, **add_params)
+        
+        # Use batch processing for long message lists
+        console.print(f"🔄 Message count ({len(messages)}) exceeds threshold ({self.config.message_batch_threshold}), using batch processing")
+        
+        results = self._upload_messages_in_batches(
+            messages=messages,
+            user_id=add_params["user_id"],
+            add_params=add_params,
+            batch_size=batch_size,
+            metadata=add_params.get("metadata")
+        )
+        
+        return self._summarize_batches(results)
+    
+    @staticmethod
+    def _summarize_batches(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Summarize per-batch add() results, merging in the first successful one."""
+        successful_batches = [r for r in results if not r.get("failed", False)]
+        failed_batches = [r for r in results if r.get("failed", False)]
+        
+        result = {
+            "batch_processing": True,
+            "total_batches": len(results),
+            "successful_batches": len(successful_batches),
+            "failed_batches": len(failed_batches),
+            "batch_results": results
+        }
+        
+        if successful_batches:
+            # Use the first successful result as primary
+            result.update(successful_batches[0])
+        
+        return result
+    
     def upload_batch(self, 
                     file_paths: List[str],
                     user_id: Optional[str] = None,
@@ -368,7 +707,8 @@ class MemoryUploader:
                     includes: Optional[str] = None,
                     excludes: Optional[str] = None,
                     infer: Optional[bool] = None,
-                    concurrent_upload: Optional[bool] = None) -> List[Dict[str, Any]]:
+                    concurrent_upload: Optional[bool] = None,
+                    group_files: Optional[bool] = None) -> List[Dict[str, Any]]:
         """
         Upload multiple files in batch with improved error handling and optional concurrency.
         
@@ -376,6 +716,7 @@ class MemoryUploader:
         - Per-file retry with 3 attempts
         - Continues with other files even if one fails  
         - Optional concurrent processing
+        - Optional grouping of small files into one API call per group
         - Detailed progress tracking
         
         Args:
@@ -387,14 +728,69 @@ class MemoryUploader:
             excludes: Content types to exclude from processing
             infer: Whether to infer memories
             concurrent_upload: Whether to process files concurrently (None = use config default)
+            group_files: Whether to pack small files into grouped API calls (None = use config default)
             
         Returns:
-            List of upload results with detailed status for each file
+            List of upload results with detailed status for each file, in input order
         """
+        use_grouping = group_files if group_files is not None else self.config.group_small_files
+        if use_grouping:
+            return self.upload_grouped(
+                file_paths,
+                user_id=user_id,
+                extract_mode=extract_mode,
+                custom_instructions=custom_instructions,
+                includes=includes,
+                excludes=excludes,
+                infer=infer,
+                concurrent_upload=concurrent_upload
+            )
+        
+        results = self._upload_files(
+            file_paths,
+            user_id=user_id,
+            extract_mode=extract_mode,
+            custom_instructions=custom_instructions,
+            includes=includes,
+            excludes=excludes,
+            infer=infer,
+            concurrent_upload=concurrent_upload
+        )
+
+        self._print_batch_summary(results)
+
+        return results
+
+    def _upload_files(self,
+                      file_paths: List[str],
+                      user_id: Optional[str] = None,
+                      extract_mode: Optional[str] = None,
+                      custom_instructions: Optional[str] = None,
+                      includes: Optional[str] = None,
+                      excludes: Optional[str] = None,
+                      infer: Optional[bool] = None,
+                      concurrent_upload: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Upload files with one request each and return per-file results (no summary)."""
+        # Resolve defaults once for the whole batch rather than in every upload_file call
         user_id = user_id or self.config.default_user_id
+        extract_mode = extract_mode or self.config.default_extract_mode
         use_concurrent = concurrent_upload if concurrent_upload is not None else self.config.concurrent_upload
         max_workers = self.config.max_concurrent_files if use_concurrent else 1
         
+        # Upload byte-identical files once and skip the copies. Hashing reads
+        # every file in full, so only do it when the upload cache is on; the
+        # digests are handed to upload_file so no file is hashed twice
+        all_paths = file_paths
+        if self.upload_cache is not None:
+            duplicate_of, all_digests = self._find_duplicate_files(all_paths)
+        else:
+            duplicate_of, all_digests = {}, [None] * len(all_paths)
+        digests = all_digests
+        if duplicate_of:
+            file_paths = [file_path for i, file_path in enumerate(all_paths) if i not in duplicate_of]
+            digests = [digest for i, digest in enumerate(all_digests) if i not in duplicate_of]
+            console.print(f"♻️  {len(duplicate_of)} duplicate files will be skipped")
+        
         console.print(f"📦 Starting batch upload: {len(file_paths)} files")
         console.print(f"🔄 Processing mode: {'concurrent' if use_concurrent else 'sequential'}")
         if use_concurrent:
@@ -402,156 +798,572 @@ class MemoryUploader:
         
         results = []
         
-        def upload_single_file_with_retry(file_path: str) -> Dict[str, Any]:
+        def upload_single_file_with_retry(file_path: str, digest: Optional[str]) -> Dict[str, Any]:
             """Upload a single file with retry logic."""
-            max_retries = 3
-            
-            for attempt in range(1, max_retries + 1):
-                try:
-                    console.print(f"📄 Uploading {file_path} (attempt {attempt}/{max_retries})")
-                    
-                    result = self.upload_file(
-                        file_path=file_path,
-                        user_id=user_id,
-                        extract_mode=extract_mode,
-                        custom_instructions=custom_instructions,
-                        includes=includes,
-                        excludes=excludes,
-                        infer=infer
-                    )
-                    
-                    console.print(f"✅ {file_path} uploaded successfully")
-                    return {
-                        "file": file_path,
-                        "status": "success", 
-                        "result": result,
-                        "attempts": attempt
-                    }
-                    
-                except Exception as e:
-                    error_msg = str(e)
-                    console.print(f"❌ {file_path} failed attempt {attempt}/{max_retries}: {error_msg}")
-                    
-                    if attempt == max_retries:
-                        # Final failure
-                        console.print(f"🚨 {file_path} failed after {max_retries} attempts, giving up")
-                        return {
-                            "file": file_path,
-                            "status": "error",
-                            "error": error_msg,
-                            "attempts": attempt,
-                            "final_failure": True
-                        }
-                    else:
-                        # Wait before retry
-                        wait_time = 2 ** attempt  # Exponential backoff: 2s, 4s, 8s
-                        console.print(f"⏳ Waiting {wait_time}s before retry...")
-                        time.sleep(wait_time)
-            
-            # Should never reach here
-            return {
-                "file": file_path,
-                "status": "error", 
-                "error": "Unknown error",
-                "attempts": max_retries
-            }
-        
-        # Execute uploads
-        if use_concurrent and len(file_paths) > 1:
-            # Concurrent processing
-            import concurrent.futures as cf
-            with cf.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                with Progress() as progress:
+            return self._upload_with_retry(file_path, lambda: self.upload_file(
+                file_path=file_path,
+                user_id=user_id,
+                extract_mode=extract_mode,
+                custom_instructions=custom_instructions,
+                includes=includes,
+                excludes=excludes,
+                infer=infer,
+                digest=digest
+            ))
+        
+        # Parse a few files ahead on a separate pool, so reading and parsing
+        # the next files overlaps the network wait of the current uploads;
+        # upload_file then finds them in FileParser.parse_file's cache. The
+        # window stays small so prefetched entries are not evicted before use.
+        prefetch_window = max_workers * 2
+        parsed = [None] * len(file_paths)
+        parse_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, min(os.cpu_count() or 1, prefetch_window))
+        )
+        
+        max_file_bytes = self.config.max_file_size_mb * 1024 * 1024
+        
+        def prefetch(index: int):
+            if index >= len(file_paths):
+                return
+            # Oversized and missing files are rejected by upload_file; do not read them here
+            try:
+                if os.path.getsize(file_paths[index]) > max_file_bytes:
+                    return
+            except OSError:
+                return
+            parsed[index] = parse_pool.submit(FileParser.parse_file, file_paths[index], extract_mode)
+        
+        def upload_at(index: int) -> Dict[str, Any]:
+            """Wait for a file's prefetched parse, queue the next one, then upload it."""
+            prefetch(index + prefetch_window)
+            if parsed[index] is not None:
+                # Parse errors resurface (and are reported) in upload_file
+                concurrent.futures.wait([parsed[index]])
+            return upload_single_file_with_retry(file_paths[index], digests[index])
+        
+        for index in range(prefetch_window):
+            prefetch(index)
+        
+        try:
+            # Execute uploads
+            if use_concurrent and len(file_paths) > 1:
+                # Concurrent processing: uploads are network waits (the Mem0 SDK is
+                # synchronous), so a thread pool overlaps them
+                max_workers = min(max_workers, len(file_paths))
+                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    with self._progress() as progress:
+                        task = progress.add_task("Uploading files...", total=len(file_paths))
+                        
+                        # Submit all tasks
+                        futures = [executor.submit(upload_at, index) for index in range(len(file_paths))]
+                        
+                        # Tick progress as uploads finish; failures come back as
+                        # error results, so one file never stops the others
+                        for _ in concurrent.futures.as_completed(futures):
+                            progress.advance(task)
+                        
+                        # Report results in input order
+                        results = [future.result() for future in futures]
+            else:
+                # Sequential processing
+                with self._progress() as progress:
                     task = progress.add_task("Uploading files...", total=len(file_paths))
                     
-                    # Submit all tasks
-                    future_to_filepath = {
-                        executor.submit(upload_single_file_with_retry, file_path): file_path
-                        for file_path in file_paths
-                    }
-                    
-                    # Collect results as they complete
-                    for future in cf.as_completed(future_to_filepath):
-                        result = future.result()
+                    for index in range(len(file_paths)):
+                        result = upload_at(index)
                         results.append(result)
                         progress.advance(task)
                         
-                        # Continue processing other files regardless of individual failures
+                        # Continue with next file regardless of current file's result
                         continue
-        else:
-            # Sequential processing
-            with Progress() as progress:
-                task = progress.add_task("Uploading files...", total=len(file_paths))
+        finally:
+            parse_pool.shutdown(wait=False)
+
+        if duplicate_of:
+            # Slot the copies back in, in input order, as skipped rather than
+            # reporting another file's result as theirs
+            unique_results = iter(results)
+            results = [
+                {"file": file_path, "status": "skipped", "duplicate_of": all_paths[duplicate_of[i]], "attempts": 0}
+                if i in duplicate_of else next(unique_results)
+                for i, file_path in enumerate(all_paths)
+            ]
+
+        return results
+
+    def _upload_with_retry(self, file_name: str, upload: Callable[[], Dict[str, Any]],
+                           max_retries: int = 3) -> Dict[str, Any]:
+        """
+        Run one file's upload with retries and exponential backoff.
+        
+        Args:
+            file_name: Name reported in messages and the result
+            upload: Performs the upload and returns Mem0's result
+            max_retries: Attempts before giving up
+            
+        Returns:
+            Per-file result dict with status, result or error, and attempts
+        """
+        for attempt in range(1, max_retries + 1):
+            try:
+                console.print(f"📄 Uploading {file_name} (attempt {attempt}/{max_retries})")
+                
+                result = upload()
                 
-                for file_path in file_paths:
-                    result = upload_single_file_with_retry(file_path)
-                    results.append(result)
+                logger.info("✅ %s uploaded successfully", file_name)
+                return {
+                    "file": file_name,
+                    "status": "success", 
+                    "result": result,
+                    "attempts": attempt
+                }
+                
+            except Exception as e:
+                error_msg = str(e)
+                console.print(f"❌ {file_name} failed attempt {attempt}/{max_retries}: {error_msg}")
+                
+                if attempt == max_retries:
+                    # Final failure
+                    console.print(f"🚨 {file_name} failed after {max_retries} attempts, giving up")
+                    return {
+                        "file": file_name,
+                        "status": "error",
+                        "error": error_msg,
+                        "attempts": attempt,
+                        "final_failure": True
+                    }
+                else:
+                    # Wait before retry
+                    wait_time = 2 ** attempt  # Exponential backoff: 2s, 4s, 8s
+                    console.print(f"⏳ Waiting {wait_time}s before retry...")
+                    time.sleep(wait_time)
+        
+        # Should never reach here
+        return {
+            "file": file_name,
+            "status": "error", 
+            "error": "Unknown error",
+            "attempts": max_retries
+        }
+
+    def upload_fileobjs(self,
+                        files: List[Tuple[str, BinaryIO]],
+                        user_id: Optional[str] = None,
+                        extract_mode: Optional[str] = None,
+                        custom_instructions: Optional[str] = None,
+                        includes: Optional[str] = None,
+                        excludes: Optional[str] = None,
+                        infer: Optional[bool] = None,
+                        concurrent_upload: Optional[bool] = None,
+                        max_workers: Optional[int] = None,
+                        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                        force: bool = False) -> List[Dict[str, Any]]:
+        """
+        Upload several open files (e.g. web uploads) without saving them to disk.
+        
+        Each file goes through upload_fileobj() with the same per-file retries
+        as upload_batch(), and a summary is printed at the end.
+        
+        Args:
+            files: (filename, binary file object) pairs
+            user_id: User ID for the memories
+            extract_mode: Processing mode
+            custom_instructions: Custom instructions for AI processing
+            includes: Content types to specifically include
+            excludes: Content types to exclude from processing
+            infer: Whether to infer memories
+            concurrent_upload: Whether to process files concurrently (None = use config default)
+            max_workers: Concurrent uploads (None = max_concurrent_files from config)
+            progress_callback: Called with each file's result as soon as it finishes
+                (from a worker thread when concurrent)
+            force: Upload even if the upload cache has a matching entry
+            
+        Returns:
+            List of upload results with detailed status for each file, in input order
+        """
+        user_id = user_id or self.config.default_user_id
+        extract_mode = extract_mode or self.config.default_extract_mode
+        use_concurrent = concurrent_upload if concurrent_upload is not None else self.config.concurrent_upload
+        
+        def upload_item(item: Tuple[str, BinaryIO]) -> Dict[str, Any]:
+            filename, fileobj = item
+            result = self._upload_with_retry(filename, lambda: self.upload_fileobj(
+                fileobj, filename,
+                user_id=user_id,
+                extract_mode=extract_mode,
+                custom_instructions=custom_instructions,
+                includes=includes,
+                excludes=excludes,
+                infer=infer,
+                force=force
+            ))
+            if progress_callback is not None:
+                progress_callback(result)
+            return result
+        
+        console.print(f"📦 Starting batch upload: {len(files)} files")
+        with self._progress() as progress:
+            task = progress.add_task("Uploading files...", total=len(files))
+            if use_concurrent and len(files) > 1:
+                workers = min(max_workers or self.config.max_concurrent_files, len(files))
+                with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(upload_item, item) for item in files]
+                    for _ in concurrent.futures.as_completed(futures):
+                        progress.advance(task)
+                    results = [future.result() for future in futures]
+            else:
+                results = []
+                for item in files:
+                    results.append(upload_item(item))
                     progress.advance(task)
-                    
-                    # Continue with next file regardless of current file's result
-                    continue
         
-        # Generate summary
+        self._print_batch_summary(results)
+        return results
+
+    @staticmethod
+    def _find_duplicate_files(file_paths: List[str]) -> Tuple[Dict[int, int], List[Optional[str]]]:
+        """
+        Find files whose bytes match an earlier file in the list.
+
+        Returns:
+            Tuple of (mapping of duplicate index to the index of the first
+            identical file, each file's digest or None if it was unreadable)
+        """
+        first_index = {}
+        duplicate_of = {}
+        digests = []
+        for i, file_path in enumerate(file_paths):
+            try:
+                digest = UploadCache.file_digest(file_path)
+            except OSError:
+                # Unreadable files are reported by the upload itself
+                digests.append(None)
+                continue
+            digests.append(digest)
+            original = first_index.setdefault(digest, i)
+            if original != i:
+                duplicate_of[i] = original
+        return duplicate_of, digests
+
+    def _print_batch_summary(self, results: List[Dict[str, Any]]):
+        """Print success/failure summary for a batch of per-file results."""
         success_count = sum(1 for r in results if r["status"] == "success")
-        error_count = len(results) - success_count
+        error_count = sum(1 for r in results if r["status"] == "error")
+        skipped_count = len(results) - success_count - error_count
+        uploaded_count = success_count + error_count
         total_attempts = sum(r.get("attempts", 0) for r in results)
-        
+
+        _flush_log()
         console.print(f"\n📊 Batch Upload Summary:")
-        console.print(f"  ✅ Successful: {success_count}/{len(file_paths)}")
-        console.print(f"  ❌ Failed: {error_count}/{len(file_paths)}")
+        console.print(f"  ✅ Successful: {success_count}/{len(results)}")
+        console.print(f"  ❌ Failed: {error_count}/{len(results)}")
         console.print(f"  🔄 Total attempts: {total_attempts}")
-        console.print(f"  📈 Success rate: {(success_count/len(file_paths)*100):.1f}%")
-        
+        if skipped_count:
+            console.print(f"  ♻️  Duplicates skipped: {skipped_count}")
+        if uploaded_count:
+            console.print(f"  📈 Success rate: {(success_count/uploaded_count*100):.1f}%")
+
         # Show failed files
         if error_count > 0:
             console.print(f"\n🚨 Failed files:")
             for result in results:
                 if result["status"] == "error":
                     console.print(f"  ❌ {result['file']}: {result['error']}")
-        
+
+    def _group_files(self,
+                     file_paths: List[str],
+                     extract_mode: str) -> Tuple[List[List[Tuple[str, List[Dict[str, str]]]]], List[str], List[Dict[str, Any]]]:
+        """
+        Parse files and pack the small ones into upload groups.
+
+        A group holds at most ``batch_size`` files, ``max_batch_request_mb`` of
+        input and ``message_batch_threshold`` messages, so each group still
+        reaches Mem0 as one short conversation. Files that need their own
+        request (long chat logs that use incremental batching, or JSON chats
+        carrying a conversation timestamp) are returned separately.
+
+        Args:
+            file_paths: List of file paths
+            extract_mode: Processing mode
+
+        Returns:
+            Tuple of (groups of (file_path, messages), individual file paths, parse errors)
+        """
+        max_group_bytes = self.config.max_batch_request_mb * 1024 * 1024
+        groups = []
+        individual = []
+        errors = []
+
+        current = []
+        current_bytes = 0
+        current_messages = 0
+
+        # Parse every file up front, overlapping the reads; packing below
+        # stays sequential so groups follow input order
+        if len(file_paths) > 1:
+            max_workers = min(self.config.max_concurrent_files, len(file_paths))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                parsed_files = list(executor.map(
+                    lambda file_path: self._parse_for_grouping(file_path, extract_mode), file_paths
+                ))
+        else:
+            parsed_files = [self._parse_for_grouping(file_path, extract_mode) for file_path in file_paths]
+
+        for file_path, parsed in zip(file_paths, parsed_files):
+            if isinstance(parsed, Exception):
+                console.print(f"❌ Failed to parse file {file_path}: {str(parsed)}")
+                errors.append({
+                    "file": file_path,
+                    "status": "error",
+                    "error": str(parsed),
+                    "attempts": 0
+                })
+                continue
+
+            file_size, messages, metadata = parsed
+
+            if len(messages) > self.config.message_batch_threshold or "updated" in metadata:
+                individual.append(file_path)
+                continue
+
+            if current and (len(current) >= self.config.batch_size or
+                            current_bytes + file_size > max_group_bytes or
+                            current_messages + len(messages) > self.config.message_batch_threshold):
+                groups.append(current)
+                current = []
+                current_bytes = 0
+                current_messages = 0
+
+            current.append((file_path, messages))
+            current_bytes += file_size
+            current_messages += len(messages)
+
+        if current:
+            groups.append(current)
+
+        # A group of one gains nothing over the regular per-file upload
+        individual.extend(group[0][0] for group in groups if len(group) == 1)
+        groups = [group for group in groups if len(group) > 1]
+
+        return groups, individual, errors
+
+    def _parse_for_grouping(self, file_path: str,
+                            extract_mode: str) -> Union[Tuple[int, List[Dict[str, str]], Dict[str, Any]], Exception]:
+        """Return (size, messages, metadata) for a file, or the exception that stopped it."""
+        try:
+            file_size = os.path.getsize(file_path)
+            file_size_mb = file_size / (1024 * 1024)
+            if file_size_mb > self.config.max_file_size_mb:
+                raise ValueError(f"File too large: {file_size_mb:.1f}MB > {self.config.max_file_size_mb}MB")
+            messages, metadata = FileParser.parse_file(file_path, extract_mode)
+        except Exception as e:
+            return e
+        return file_size, messages, metadata
+
+    def _upload_group(self,
+                      group: List[Tuple[str, List[Dict[str, str]]]],
+                      user_id: str,
+                      custom_instructions: Optional[str] = None,
+                      includes: Optional[str] = None,
+                      excludes: Optional[str] = None,
+                      infer: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Upload a group of parsed files with a single Mem0 add() call.
+
+        Returns:
+            One result per file in the group, in input order
+        """
+        messages = [msg for _, file_messages in group for msg in file_messages]
+        add_params = ApiParameterBuilder.build_upload_params(
+            user_id=user_id,
+            custom_instructions=custom_instructions,
+            includes=includes,
+            excludes=excludes,
+            infer=infer,
+            metadata={"filenames": [os.path.basename(file_path) for file_path, _ in group]}
+        )
+
+        try:
+            result = self._add_with_retry(messages, **add_params)
+        except Exception as e:
+            console.print(f"❌ Failed to upload group of {len(group)} files: {str(e)}")
+            return [
+                {"file": file_path, "status": "error", "error": str(e), "attempts": 1}
+                for file_path, _ in group
+            ]
+
+        logger.info("✅ Uploaded group of %d files (%d messages) for user: %s", len(group), len(messages), user_id)
+        return [
+            {"file": file_path, "status": "success", "result": result, "attempts": 1, "group_size": len(group)}
+            for file_path, _ in group
+        ]
+
+    def upload_grouped(self,
+                       file_paths: List[str],
+                       user_id: Optional[str] = None,
+                       extract_mode: Optional[str] = None,
+                       custom_instructions: Optional[str] = None,
+                       includes: Optional[str] = None,
+                       excludes: Optional[str] = None,
+                       infer: Optional[bool] = None,
+                       concurrent_upload: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Upload multiple files, packing small files into one API call per group.
+
+        Cuts the number of Mem0 round-trips for directories full of short
+        notes. Files that need their own request are uploaded one request
+        each, as in ``upload_batch``.
+
+        Args:
+            file_paths: List of file paths
+            user_id: User ID for the memories
+            extract_mode: Processing mode
+            custom_instructions: Custom instructions for AI processing
+            includes: Content types to specifically include
+            excludes: Content types to exclude from processing
+            infer: Whether to infer memories
+            concurrent_upload: Whether to process individual files concurrently
+
+        Returns:
+            List of upload results with status for each file, in input order
+        """
+        user_id = user_id or self.config.default_user_id
+        extract_mode = extract_mode or self.config.default_extract_mode
+
+        groups, individual, results = self._group_files(file_paths, extract_mode)
+        grouped_count = sum(len(group) for group in groups)
+        console.print(f"📦 Grouped upload: {grouped_count} files in {len(groups)} requests, {len(individual)} files uploaded individually")
+
+        use_concurrent = concurrent_upload if concurrent_upload is not None else self.config.concurrent_upload
+        group_params = {
+            "user_id": user_id,
+            "custom_instructions": custom_instructions,
+            "includes": includes,
+            "excludes": excludes,
+            "infer": infer
+        }
+
+        if use_concurrent and len(groups) > 1:
+            # Group requests are pure network waits, so overlap them
+            max_workers = min(self.config.max_concurrent_files, len(groups))
+            console.print(f"⚡ Max concurrent group requests: {max_workers}")
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                with self._progress() as progress:
+                    task = progress.add_task("Uploading groups...", total=len(groups))
+                    futures = [executor.submit(self._upload_group, group, **group_params) for group in groups]
+                    for future in concurrent.futures.as_completed(futures):
+                        results.extend(future.result())
+                        progress.advance(task)
+        elif groups:
+            with self._progress() as progress:
+                task = progress.add_task("Uploading groups...", total=len(groups))
+                for group in groups:
+                    results.extend(self._upload_group(group, **group_params))
+                    progress.advance(task)
+
+        if individual:
+            results.extend(self._upload_files(
+                individual,
+                user_id=user_id,
+                extract_mode=extract_mode,
+                custom_instructions=custom_instructions,
+                includes=includes,
+                excludes=excludes,
+                infer=infer,
+                concurrent_upload=concurrent_upload
+            ))
+
+        order = {file_path: i for i, file_path in enumerate(file_paths)}
+        results.sort(key=lambda r: order[r["file"]])
+
+        self._print_batch_summary(results)
+
         return results
+
+    def _iter_supported_files(self, directory_path: str, recursive: bool = True) -> Iterator[str]:
+        """
+        Yield paths of supported files under a directory.
+
+        Uses os.scandir so file/directory checks come from the cached
+        directory entry instead of a stat call per file. Symlinked files are
+        included, like os.walk + os.path.isfile did; symlinked directories
+        are not descended into. Hidden directories (.git, .venv, ...) and
+        those named in file_processing.ignore_dirs (node_modules,
+        __pycache__, ...) are pruned without being listed.
+
+        Args:
+            directory_path: Directory to scan
+            recursive: Whether to descend into subdirectories
+
+        Yields:
+            Path of each file whose extension is in the supported formats
+        """
+        supported_extensions = self.config.supported_extensions
+        ignore_dirs = self.config.ignore_dirs
+        with os.scandir(directory_path) as entries:
+            subdirs = []
+            for entry in entries:
+                if entry.is_file():
+                    if os.path.splitext(entry.name)[1].lower() in supported_extensions:
+                        yield entry.path
+                elif (recursive and not entry.name.startswith('.') and entry.name not in ignore_dirs and
+                      entry.is_dir(follow_symlinks=False)):
+                    subdirs.append(entry.path)
+        
+        # Descend after closing this directory's handle to keep open fds bounded
+        for subdir in subdirs:
+            yield from self._iter_supported_files(subdir, recursive)
     
-    def upload_directory(self, 
+    def upload_directory(self,
                         directory_path: str,
                         user_id: Optional[str] = None,
                         extract_mode: Optional[str] = None,
-                        recursive: bool = True) -> List[Dict[str, Any]]:
+                        recursive: bool = True,
+                        custom_instructions: Optional[str] = None,
+                        includes: Optional[str] = None,
+                        excludes: Optional[str] = None,
+                        infer: Optional[bool] = None,
+                        concurrent_upload: Optional[bool] = None,
+                        group_files: Optional[bool] = None) -> List[Dict[str, Any]]:
         """
         Upload all supported files from a directory.
-        
+
         Args:
             directory_path: Path to the directory
             user_id: User ID for the memories
             extract_mode: Processing mode
             recursive: Whether to search subdirectories
-            
+            custom_instructions: Custom instructions for AI processing
+            includes: Content types to specifically include
+            excludes: Content types to exclude from processing
+            infer: Whether to infer memories
+            concurrent_upload: Whether to process files concurrently (None = use config default)
+            group_files: Whether to pack small files into grouped API calls (None = use config default)
+
         Returns:
             List of upload results
         """
-        if not os.path.exists(directory_path):
-            raise FileNotFoundError(f"Directory not found: {directory_path}")
-        
         # Find all supported files
-        supported_extensions = self.config.supported_formats
-        file_paths = []
-        
-        if recursive:
-            for root, dirs, files in os.walk(directory_path):
-                for file in files:
-                    if any(file.lower().endswith(ext) for ext in supported_extensions):
-                        file_paths.append(os.path.join(root, file))
-        else:
-            for file in os.listdir(directory_path):
-                file_path = os.path.join(directory_path, file)
-                if os.path.isfile(file_path) and any(file.lower().endswith(ext) for ext in supported_extensions):
-                    file_paths.append(file_path)
+        file_paths = list(self._iter_supported_files(directory_path, recursive))
         
         if not file_paths:
             console.print(f"⚠️  No supported files found in {directory_path}")
             return []
         
         console.print(f"📁 Found {len(file_paths)} files to upload")
-        return self.upload_batch(file_paths, user_id, extract_mode)
+
+        return self.upload_batch(
+            file_paths,
+            user_id=user_id,
+            extract_mode=extract_mode,
+            custom_instructions=custom_instructions,
+            includes=includes,
+            excludes=excludes,
+            infer=infer,
+            concurrent_upload=concurrent_upload,
+            group_files=group_files
+        )
     
     def _upload_messages_in_batches(self,
                                   messages: List[Dict[str, str]],
@@ -1,13 +1,33 @@
 """Common utilities and helper functions."""
 
+import json
+import mmap
 import os
-from typing import List, Dict, Any, Optional, Union
-from datetime import datetime
-from rich.console import Console
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Union
+from rich.console import Console, Group
 from rich.table import Table
+from rich.text import Text
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: exact token counts for the upload size preflight
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_token_encoder = None
 
 console = Console()
 
+# Above this many results, print plain lines; Rich's table layout measures
+# every cell and gets slow on large result sets
+_PLAIN_TEXT_ROWS = 200
+
 
 class DebugLogger:
     """Centralized debug logging utility."""
@@ -122,26 +142,38 @@ class DateTimeHelper:
         if not date_str or date_str == 'N/A':
             return 'N/A'
         
-        try:
-            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            return dt.strftime('%Y-%m-%d')
-        except:
-            return date_str[:10] if len(date_str) >= 10 else date_str
+        # Mem0 returns ISO 8601 strings, whose first 10 characters are the date
+        return date_str[:10]
 
 
 class ResultDisplayer:
     """Handle result display in different formats."""
     
     @staticmethod
-    def display_console_results(results: List[Dict[str, Any]], max_content_length: int = 100, title: str = ""):
-        """Display search results in console table format."""
-        if not results:
-            console.print("📭 No results found")
-            return
-        
-        if title:
-            console.print(f"\n{title}")
-        
+    def _console_rows(results: List[Dict[str, Any]],
+                      max_content_length: Optional[int] = 100) -> List[Tuple[str, str, str, str, str]]:
+        """Format each result as (id, content, created, source, score) strings."""
+        rows = []
+        for result in results:
+            content = result.get('memory', '')
+            
+            # Truncate content if too long (None shows it in full)
+            if max_content_length is not None and len(content) > max_content_length:
+                content = content[:max_content_length] + "..."
+            
+            score = result.get('score', 0)
+            rows.append((
+                result.get('id', 'N/A')[:8],
+                content,
+                DateTimeHelper.format_display_date(result.get('created_at', 'N/A')),
+                (result.get('metadata') or {}).get('source', 'unknown'),
+                f"{score:.2f}" if isinstance(score, (int, float)) else str(score)
+            ))
+        return rows
+    
+    @staticmethod
+    def build_console_table(results: List[Dict[str, Any]], max_content_length: Optional[int] = 100) -> Table:
+        """Build the console table for search results without printing it."""
         table = Table(title="Memory Search Results")
         table.add_column("ID", style="cyan", width=8)
         table.add_column("Content", style="white", width=50)
@@ -149,39 +181,50 @@ class ResultDisplayer:
         table.add_column("Source", style="yellow", width=15)
         table.add_column("Score", style="magenta", width=8)
         
-        for result in results:
-            memory_id = result.get('id', 'N/A')[:8]
-            content = result.get('memory', '')
-            
-            # Truncate content if too long
-            if len(content) > max_content_length:
-                content = content[:max_content_length] + "..."
-            
-            created_at = DateTimeHelper.format_display_date(result.get('created_at', 'N/A'))
-            
-            metadata = result.get('metadata', {})
-            source = metadata.get('source', 'unknown')
-            
-            score = result.get('score', 0)
-            score_str = f"{score:.2f}" if isinstance(score, (int, float)) else str(score)
-            
-            table.add_row(memory_id, content, created_at, source, score_str)
+        for row in ResultDisplayer._console_rows(results, max_content_length):
+            table.add_row(*row)
         
-        console.print(table)
+        return table
     
     @staticmethod
-    def prepare_dataframe_data(results: List[Dict[str, Any]]) -> List[Dict[str, str]]:
-        """Prepare search results for DataFrame display."""
-        data = []
-        for result in results:
-            data.append({
-                "ID": result.get('id', 'N/A')[:8],
-                "Content": result.get('memory', '')[:100] + "..." if len(result.get('memory', '')) > 100 else result.get('memory', ''),
-                "Created": DateTimeHelper.format_display_date(result.get('created_at')),
-                "Source": result.get('metadata', {}).get('source', 'unknown'),
-                "Score": f"{result.get('score', 0):.2f}" if isinstance(result.get('score'), (int, float)) else str(result.get('score', 'N/A'))
-            })
-        return data
+    def build_console_text(results: List[Dict[str, Any]], max_content_length: Optional[int] = 100) -> Text:
+        """Build one plain line per result, for result sets too large for a table."""
+        lines = [
+            f"{memory_id:<8}  {created_at:<10}  {source:<15}  {score_str:>6}  {content}"
+            for memory_id, content, created_at, source, score_str
+            in ResultDisplayer._console_rows(results, max_content_length)
+        ]
+        return Text("\n".join(lines))
+    
+    @staticmethod
+    def display_console_results(results: List[Dict[str, Any]], max_content_length: Optional[int] = 100,
+                                title: str = ""):
+        """Display search results in console table format."""
+        if not results:
+            console.print("📭 No results found")
+            return
+        
+        if len(results) > _PLAIN_TEXT_ROWS:
+            output = ResultDisplayer.build_console_text(results, max_content_length)
+        else:
+            output = ResultDisplayer.build_console_table(results, max_content_length)
+        console.print(Group(f"\n{title}", output) if title else output)
+    
+    @staticmethod
+    def prepare_dataframe_columns(results: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """
+        Collect search results column by column for DataFrame display.
+        
+        Content is left untruncated and Score unformatted, so the caller can
+        do both as vectorized column operations.
+        """
+        return {
+            "ID": [result.get('id', 'N/A')[:8] for result in results],
+            "Content": [result.get('memory', '') for result in results],
+            "Created": [DateTimeHelper.format_display_date(result.get('created_at')) for result in results],
+            "Source": [(result.get('metadata') or {}).get('source', 'unknown') for result in results],
+            "Score": [result.get('score', 'N/A') for result in results],
+        }
 
 
 class ApiParameterBuilder:
@@ -270,29 +313,80 @@ class MessageProcessor:
         return content[:max_length] + "..." if len(content) > max_length else content
     
     @staticmethod
-    def log_messages_debug(messages: List[Dict[str, str]], logger: DebugLogger, max_display: int = 3):
-        """Log messages for debugging."""
-        if not logger.enable_debug or not messages:
-            return
+    def estimate_tokens(text: str) -> int:
+        """Count tokens with tiktoken's cl100k_base when installed, else estimate ~4 chars per token."""
+        global _token_encoder
+        if tiktoken is None:
+            return (len(text) + 3) // 4
+        
+        # Building the encoder loads its vocabulary, so do it once per process
+        if _token_encoder is None:
+            _token_encoder = tiktoken.get_encoding("cl100k_base")
+        return len(_token_encoder.encode(text, disallowed_special=()))
+    
+    @staticmethod
+    def split_by_tokens(messages: List[Dict[str, str]], max_tokens: int,
+                        overlap_messages: int = 1) -> List[List[Dict[str, str]]]:
+        """
+        Split messages on message boundaries into chunks of at most max_tokens.
+        
+        Each chunk after the first repeats the last overlap_messages messages
+        of the previous one so Mem0 keeps some conversational context.
+        
+        Args:
+            messages: Messages to split
+            max_tokens: Token budget per chunk
+            overlap_messages: Messages carried over between chunks
+            
+        Returns:
+            List of message chunks
             
-        for i, msg in enumerate(messages[:max_display]):
+        Raises:
+            ValueError: If a single message is over the budget on its own
+        """
+        counts = [MessageProcessor.estimate_tokens(msg.get('content', '')) for msg in messages]
+        for count in counts:
+            if count > max_tokens:
+                raise ValueError(f"Message too long: ~{count} tokens > {max_tokens} token upload limit")
+        
+        chunks = []
+        start = 0      # First message of the next chunk, including carried-over context
+        unsent = 0     # First message not sent in any chunk yet
+        while unsent < len(messages):
+            end = start
+            total = 0
+            while end < len(messages) and total + counts[end] <= max_tokens:
+                total += counts[end]
+                end += 1
+            if end <= unsent:
+                # The carried-over context leaves no room for a new message
+                start = unsent
+                continue
+            chunks.append(messages[start:end])
+            unsent = end
+            start = max(end - overlap_messages, 0)
+        return chunks
+    
+    @staticmethod
+    def format_messages_debug(messages: List[Dict[str, str]], max_display: int = 3) -> List[str]:
+        """Format a preview of the first messages as debug lines."""
+        lines = []
+        for i, msg in enumerate(islice(messages, max_display)):
             if isinstance(msg, dict) and 'content' in msg:
                 content_preview = MessageProcessor.truncate_content_preview(msg['content'])
                 role = msg.get('role', 'unknown')
-                console.print(f"  💬 messages[{i}]: role='{role}', content='{content_preview}'")
+                lines.append(f"  💬 messages[{i}]: role='{role}', content='{content_preview}'")
             elif isinstance(msg, str):
                 content_preview = MessageProcessor.truncate_content_preview(msg)
-                console.print(f"  💬 messages[{i}]: '{content_preview}'")
+                lines.append(f"  💬 messages[{i}]: '{content_preview}'")
         
         if len(messages) > max_display:
-            console.print(f"  💬 ... and {len(messages) - max_display} more messages")
+            lines.append(f"  💬 ... and {len(messages) - max_display} more messages")
+        return lines
     
     @staticmethod
-    def log_metadata_debug(metadata: Dict[str, Any], logger: DebugLogger):
-        """Log metadata for debugging."""
-        if not logger.enable_debug:
-            return
-            
+    def format_metadata_debug(metadata: Dict[str, Any]) -> str:
+        """Format metadata as a debug line, shortening long string values."""
         metadata_summary = {}
         for key, value in metadata.items():
             if key in ['upload_time', 'user_id', 'extract_mode', 'file_name', 'file_type']:
@@ -301,4 +395,62 @@ class MessageProcessor:
                 metadata_summary[key] = value[:30] + "..."
             else:
                 metadata_summary[key] = value
-        console.print(f"  📋 metadata: {metadata_summary}") 
\ No newline at end of file
+        return f"  📋 metadata: {metadata_summary}"
+    
+    @staticmethod
+    def log_messages_debug(messages: List[Dict[str, str]], logger: DebugLogger, max_display: int = 3):
+        """Log messages for debugging."""
+        if not logger.enable_debug or not messages:
+            return
+        
+        console.print("\n".join(MessageProcessor.format_messages_debug(messages, max_display)),
+                      markup=False, highlight=False, soft_wrap=True)
+    
+    @staticmethod
+    def log_metadata_debug(metadata: Dict[str, Any], logger: DebugLogger):
+        """Log metadata for debugging."""
+        if not logger.enable_debug:
+            return
+        
+        console.print(MessageProcessor.format_metadata_debug(metadata), markup=False, highlight=False, soft_wrap=True)
+
+
+class JsonCodec:
+    """JSON encoding/decoding backed by orjson when installed, stdlib json otherwise."""
+    
+    @staticmethod
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse JSON text; raises a json.JSONDecodeError subclass on bad input."""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    
+    @staticmethod
+    def load_file(file_path: str) -> Any:
+        """
+        Parse a JSON file straight from its bytes.
+        
+        With orjson the file is memory-mapped and parsed in place, so no
+        intermediate bytes or str copy of the file is built.
+        
+        Args:
+            file_path: Path to a UTF-8 JSON file
+            
+        Returns:
+            The decoded JSON value
+        """
+        with open(file_path, 'rb') as f:
+            if orjson is None or os.fstat(f.fileno()).st_size == 0:
+                return json.loads(f.read())
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    return orjson.loads(view)
+    
+    @staticmethod
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize to UTF-8 JSON bytes, non-ASCII characters kept as-is."""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+            return orjson.dumps(obj, option=option)
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
@@ -1,25 +1,89 @@
 """Web interface helper functions and utilities."""
 
 import streamlit as st
-import pandas as pd
-import json
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Mapping, Tuple
 
-from .utils import ResultDisplayer, DateTimeHelper
+from .client import memory_write_generation
+from .utils import ResultDisplayer, DateTimeHelper, JsonCodec
 
+# pandas is imported where tables are built, so upload-only sessions never load it
+if TYPE_CHECKING:
+    import pandas as pd
 
-def perform_search(searcher, query: str, user_id: str, limit: int = 10):
+# Privacy presets offered in the sidebar and the excludes text each one adds
+PRESET_MAPPING: Mapping[str, str] = MappingProxyType({
+    "个人姓名": "personal names, individual names",
+    "联系方式": "contact information, phone numbers, email addresses",
+    "地址信息": "addresses, location information",
+    "财务信息": "financial information, bank details, payment info",
+    "密码/秘钥": "passwords, keys, credentials, tokens",
+    "身份证号": "ID numbers, identification numbers",
+    "其他敏感信息": "sensitive personal information, confidential data"
+})
+
+
+# Seconds a fetched result is reused across reruns, e.g. when toggling a checkbox
+_FETCH_TTL_SECONDS = 60
+
+
+# The leading underscore keeps Streamlit from hashing the searcher; it is the
+# one shared instance, so the remaining arguments identify the request.
+# write_generation is memory_write_generation() at call time, so any upload
+# in this process starts a new cache entry instead of serving stale results.
+@st.cache_data(ttl=_FETCH_TTL_SECONDS, show_spinner=False)
+def _fetch_search(_searcher, query: str, user_id: str, write_generation: int) -> List[Dict[str, Any]]:
+    """Fetch semantic search results."""
+    return _searcher.search_by_query(
+        query=query,
+        user_id=user_id,
+        # limit=limit
+    )
+
+
+@st.cache_data(ttl=_FETCH_TTL_SECONDS, show_spinner=False)
+def _fetch_time_search(_searcher, user_id: str, days_back: Optional[int], start_date: Optional[str],
+                       end_date: Optional[str], query: Optional[str], write_generation: int) -> List[Dict[str, Any]]:
+    """Fetch time range search results."""
+    return _searcher.search_by_time_range(
+        days_back=days_back,
+        start_date=start_date,
+        end_date=end_date,
+        query=query,
+        user_id=user_id
+    )
+
+
+@st.cache_data(ttl=_FETCH_TTL_SECONDS, show_spinner=False)
+def _fetch_weekly_report(_searcher, weeks_back: int, user_id: str, write_generation: int) -> Dict[str, Any]:
+    """Fetch weekly report data."""
+    return _searcher.search_weekly_report_data(
+        weeks_back=weeks_back,
+        user_id=user_id
+    )
+
+
+@st.cache_data(ttl=_FETCH_TTL_SECONDS, show_spinner=False)
+def _weekly_report_json(_searcher, weeks_back: int, user_id: str, write_generation: int) -> bytes:
+    """Serialize the weekly report for download once per report, not on every rerun."""
+    return JsonCodec.dumps(_fetch_weekly_report(_searcher, weeks_back, user_id, write_generation), indent=True)
+
+
+@st.cache_data(ttl=_FETCH_TTL_SECONDS, show_spinner=False)
+def _fetch_user_stats(_searcher, user_id: str, write_generation: int) -> Dict[str, Any]:
+    """Fetch user statistics."""
+    return _searcher.get_user_stats(user_id)
+
+
+def perform_search(searcher, query: str, user_id: str, limit: int = 10, show_full: bool = False):
     """Perform a search and display results."""
     try:
         with st.spinner("Searching..."):
-            results = searcher.search_by_query(
-                query=query,
-                user_id=user_id,
-                # limit=limit
-            )
+            results = _fetch_search(searcher, query, user_id, memory_write_generation())
         
-        display_search_results(results, f"🔍 Search Results for: '{query}'")
+        display_search_results(results, f"🔍 Search Results for: '{query}'", show_full=show_full)
         
     except Exception as e:
         st.error(f"❌ Search failed: {str(e)}")
@@ -31,13 +95,8 @@ def perform_time_search(searcher, user_id: str, days_back: Optional[int] = None,
     """Perform time-based search and display results."""
     try:
         with st.spinner("Searching..."):
-            results = searcher.search_by_time_range(
-                days_back=days_back,
-                start_date=start_date,
-                end_date=end_date,
-                query=query,
-                user_id=user_id
-            )
+            results = _fetch_time_search(searcher, user_id, days_back, start_date, end_date, query,
+                                         memory_write_generation())
         
         time_desc = f"{days_back} days ago" if days_back else f"{start_date} to {end_date}"
         title = f"📅 Time Search Results: {time_desc}"
@@ -53,11 +112,10 @@ def perform_time_search(searcher, user_id: str, days_back: Optional[int] = None,
 def generate_weekly_report(searcher, weeks_back: int, user_id: str):
     """Generate and display weekly report."""
     try:
+        # One generation for the report and its download, so both show the same data
+        write_generation = memory_write_generation()
         with st.spinner("Generating report..."):
-            report_data = searcher.search_weekly_report_data(
-                weeks_back=weeks_back,
-                user_id=user_id
-            )
+            report_data = _fetch_weekly_report(searcher, weeks_back, user_id, write_generation)
         
         # Report summary
         st.subheader(f"📊 Weekly Report (Week {weeks_back} ago)")
@@ -73,28 +131,46 @@ def generate_weekly_report(searcher, weeks_back: int, user_id: str):
         # Current week memories
         if report_data['week_memories']:
             st.subheader("📅 Current Week Memories")
-            display_search_results(report_data['week_memories'][:10], "")
+            display_search_results(report_data['week_memories'][:10], "", key="week")
         
         # Related memories
         if report_data['related_memories']:
             st.subheader("🔗 Related Historical Memories")
-            display_search_results(report_data['related_memories'][:5], "")
+            display_search_results(report_data['related_memories'][:5], "", key="related")
         
-        # Download report data
-        if st.button("💾 Download Report Data"):
-            st.download_button(
-                label="📄 Download JSON",
-                data=json.dumps(report_data, indent=2, ensure_ascii=False),
-                file_name=f"weekly_report_{report_data['week_start']}.json",
-                mime="application/json"
-            )
+        # Download report data (a download button nested under st.button
+        # vanished on the rerun its own click triggers, so show it directly)
+        st.download_button(
+            label="💾 Download Report Data",
+            data=_weekly_report_json(searcher, weeks_back, user_id, write_generation),
+            file_name=f"weekly_report_{report_data['week_start']}.json",
+            mime="application/json"
+        )
         
     except Exception as e:
         st.error(f"❌ Report generation failed: {str(e)}")
 
 
-def display_search_results(results: List[Dict[str, Any]], title: str):
-    """Display search results in a table."""
+def _results_dataframe(results: List[Dict[str, Any]],
+                       max_content_length: Optional[int] = 100) -> "pd.DataFrame":
+    """Build the results table, truncating content and making scores numeric per column."""
+    import pandas as pd
+    
+    df = pd.DataFrame(ResultDisplayer.prepare_dataframe_columns(results))
+    
+    if max_content_length is not None:
+        content = df["Content"].astype(str)
+        df["Content"] = content.where(content.str.len() <= max_content_length,
+                                      content.str.slice(0, max_content_length) + "...")
+    
+    # Formatted by the browser through column_config; non-numeric scores show as empty
+    df["Score"] = pd.to_numeric(df["Score"], errors="coerce")
+    return df
+
+
+def display_search_results(results: List[Dict[str, Any]], title: str, key: str = "results",
+                           show_full: bool = False):
+    """Display search results in a table; key must differ between tables on one page."""
     if not results:
         st.info("📭 No results found")
         return
@@ -103,15 +179,19 @@ def display_search_results(results: List[Dict[str, Any]], title: str):
         st.subheader(title)
     
     # Convert to DataFrame for better display
-    data = ResultDisplayer.prepare_dataframe_data(results)
-    df = pd.DataFrame(data)
-    st.dataframe(df, use_container_width=True)
+    df = _results_dataframe(results, None if show_full else 100)
+    st.dataframe(
+        df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={"Score": st.column_config.NumberColumn(format="%.2f")}
+    )
     
     # Detailed view
-    if st.checkbox("📋 Show Detailed View"):
+    if st.checkbox("📋 Show Detailed View", key=f"{key}_details"):
         for i, result in enumerate(results[:5]):  # Limit to first 5 for performance
             with st.expander(f"Memory {i+1}: {result.get('id', 'N/A')[:8]}"):
-                st.text_area("Content", result.get('memory', ''), height=100, key=f"content_{i}")
+                st.text_area("Content", result.get('memory', ''), height=100, key=f"{key}_content_{i}")
                 
                 metadata = result.get('metadata', {})
                 if metadata:
@@ -119,37 +199,42 @@ def display_search_results(results: List[Dict[str, Any]], title: str):
 
 
 def show_stats(searcher, user_id: str):
-    """Show user statistics."""
+    """Show user statistics (fetched at most once per minute per user)."""
     try:
         with st.spinner("Loading stats..."):
-            stats = searcher.get_user_stats(user_id)
+            stats = _fetch_user_stats(searcher, user_id, memory_write_generation())
         
-        st.subheader("📊 User Statistics")
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total Memories", stats['total_memories'])
-        with col2:
-            st.metric("Recent (7 days)", stats['recent_memories_7d'])
-        with col3:
-            st.metric("User ID", stats['user_id'])
-        
-        # Sources chart
-        if stats['sources']:
-            st.subheader("📋 Sources Breakdown")
-            source_df = pd.DataFrame(list(stats['sources'].items()), columns=['Source', 'Count'])
-            st.bar_chart(source_df.set_index('Source'))
-        
-        # Extract modes
-        if stats['extract_modes']:
-            st.subheader("⚙️ Extract Modes")
-            mode_df = pd.DataFrame(list(stats['extract_modes'].items()), columns=['Mode', 'Count'])
-            st.bar_chart(mode_df.set_index('Mode'))
+        render_stats(stats)
         
     except Exception as e:
         st.error(f"❌ Failed to load stats: {str(e)}")
 
 
+def render_stats(stats: Dict[str, Any]):
+    """Render user statistics from get_user_stats()."""
+    import pandas as pd
+    
+    st.subheader("📊 User Statistics")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Memories", stats['total_memories'])
+    with col2:
+        st.metric("Recent (7 days)", stats['recent_memories_7d'])
+    with col3:
+        st.metric("User ID", stats['user_id'])
+    
+    # Sources chart
+    if stats['sources']:
+        st.subheader("📋 Sources Breakdown")
+        st.bar_chart(pd.Series(stats['sources'], name='Count').rename_axis('Source'))
+    
+    # Extract modes
+    if stats['extract_modes']:
+        st.subheader("⚙️ Extract Modes")
+        st.bar_chart(pd.Series(stats['extract_modes'], name='Count').rename_axis('Mode'))
+
+
 def create_advanced_settings_ui(settings_key_prefix: str, advanced_settings: Dict[str, Any]) -> Dict[str, Any]:
     """Create advanced settings UI components and return current values."""
     with st.expander("⚙️ Advanced Settings", expanded=advanced_settings.get('advanced_settings_expanded', False)):
@@ -193,7 +278,7 @@ def create_advanced_settings_ui(settings_key_prefix: str, advanced_settings: Dic
             # 预设的排除选项
             exclude_presets = st.multiselect(
                 "常用排除选项",
-                ["个人姓名", "联系方式", "地址信息", "财务信息", "密码/秘钥", "身份证号", "其他敏感信息"],
+                list(PRESET_MAPPING),
                 default=advanced_settings.get(f'{settings_key_prefix}_exclude_presets', []),
                 help="选择常用的排除类型，会自动添加到排除内容中",
                 key=f"{settings_key_prefix}_exclude_presets_input"
@@ -237,24 +322,43 @@ def create_metadata_ui() -> Dict[str, str]:
     return metadata
 
 
+@lru_cache(maxsize=128)
+def _joined_preset_excludes(exclude_presets: Tuple[str, ...]) -> str:
+    """Join the exclude descriptions for a selection of presets."""
+    return ", ".join([PRESET_MAPPING.get(preset, preset) for preset in exclude_presets])
+
+
 def process_exclude_presets(excludes: str, exclude_presets: List[str]) -> str:
     """Process exclude presets and combine with manual excludes."""
-    preset_mapping = {
-        "个人姓名": "personal names, individual names",
-        "联系方式": "contact information, phone numbers, email addresses",
-        "地址信息": "addresses, location information",
-        "财务信息": "financial information, bank details, payment info",
-        "密码/秘钥": "passwords, keys, credentials, tokens",
-        "身份证号": "ID numbers, identification numbers",
-        "其他敏感信息": "sensitive personal information, confidential data"
-    }
-    
     final_excludes = excludes
     if exclude_presets:
-        preset_excludes = ", ".join([preset_mapping.get(preset, preset) for preset in exclude_presets])
+        preset_excludes = _joined_preset_excludes(tuple(exclude_presets))
         if final_excludes:
             final_excludes = f"{final_excludes}, {preset_excludes}"
         else:
             final_excludes = preset_excludes
     
-    return final_excludes 
\ No newline at end of file
+    return final_excludes
+
+
+def resolve_upload_settings(advanced_settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn the sidebar advanced settings into upload keyword arguments.
+    
+    Args:
+        advanced_settings: Settings dict kept in st.session_state
+        
+    Returns:
+        custom_instructions, includes, excludes (with presets) and infer, ready
+        to pass to upload_text/upload_file/upload_batch
+    """
+    final_excludes = process_exclude_presets(
+        advanced_settings['excludes'],
+        advanced_settings['exclude_presets']
+    )
+    return {
+        "custom_instructions": advanced_settings['custom_instructions'].strip() or None,
+        "includes": advanced_settings['includes'].strip() or None,
+        "excludes": final_excludes.strip() or None,
+        "infer": advanced_settings['infer'],
+    }
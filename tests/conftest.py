@@ -0,0 +1,80 @@
+"""Shared fixtures: an uploader wired to a fake Mem0 client and a temporary config."""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import core.searcher as searcher_module
+import core.uploader as uploader_module
+from core.config import Config
+from core.searcher import MemorySearcher
+from core.uploader import MemoryUploader
+
+
+class FakeMemoryClient:
+    """Records add() and search() calls; fail_adds makes every add() raise."""
+
+    def __init__(self):
+        self.added: List[List[Dict[str, str]]] = []
+        self.fail_adds = False
+        self.searches = 0
+        self.search_response: Any = [{"id": "m1", "memory": "Release is on Friday"}]
+
+    def add(self, messages, **kwargs) -> Dict[str, Any]:
+        self.added.append(messages)
+        if self.fail_adds:
+            raise RuntimeError("Mem0 unavailable")
+        return {"results": [{"id": str(len(self.added)), "event": "ADD"}]}
+
+    def search(self, **kwargs) -> Any:
+        self.searches += 1
+        return self.search_response
+
+
+@pytest.fixture
+def make_config(tmp_path, monkeypatch):
+    """Build a Config from a temporary config.yaml with the given sections merged in."""
+    monkeypatch.delenv("MEM0_CLIENT_CACHE", raising=False)
+
+    def make(overrides: Optional[Dict[str, Any]] = None) -> Config:
+        data = {
+            "mem0": {"api_key": "test-key"},
+            "debug": {"enable_api_logging": False},
+            "file_processing": {"supported_formats": [".md", ".txt", ".json"]},
+            "upload_cache": {"path": str(tmp_path / "cache.db")},
+        }
+        for section, values in (overrides or {}).items():
+            data.setdefault(section, {}).update(values)
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(data), encoding="utf-8")
+        return Config(str(config_path))
+
+    return make
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    """Fake Mem0 client handed to every uploader created in the test."""
+    client = FakeMemoryClient()
+    monkeypatch.setattr(uploader_module, "get_memory_client", lambda api_key: (client, False))
+    monkeypatch.setattr(searcher_module, "get_memory_client", lambda api_key: (client, False))
+    # Skip the retry backoff and the pause after a failed batch
+    monkeypatch.setattr(uploader_module.time, "sleep", lambda seconds: None)
+    return client
+
+
+@pytest.fixture
+def uploader(make_config, fake_client) -> MemoryUploader:
+    """Uploader with the upload cache enabled in a temporary database."""
+    return MemoryUploader(make_config())
+
+
+@pytest.fixture
+def searcher(make_config, fake_client) -> MemorySearcher:
+    """Searcher sharing the fake client, with the result cache on."""
+    return MemorySearcher(make_config({"search": {"cache_ttl_seconds": 60}}))
@@ -0,0 +1,15 @@
+"""Tests for Config."""
+
+from core.config import Config
+
+
+def test_config_edits_do_not_leak_into_other_instances(make_config, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "_save_config", lambda self: None)
+    first = make_config({"advanced_settings": {"includes": "decisions"}})
+    second = Config(str(tmp_path / "config.yaml"))
+
+    first.update_advanced_settings(includes="deadlines")
+
+    assert first.advanced_includes == "deadlines"
+    assert second.config["advanced_settings"]["includes"] == "decisions"
+    assert Config(str(tmp_path / "config.yaml")).advanced_includes == "decisions"
@@ -0,0 +1,98 @@
+"""Tests for FileParser."""
+
+import json
+
+import pytest
+
+import core.parser as parser_module
+from core.parser import FileParser
+
+
+@pytest.fixture
+def empty_parse_cache(monkeypatch):
+    """Give the test its own empty parse_file cache."""
+    monkeypatch.setattr(parser_module, "_parse_cache", parser_module.OrderedDict())
+    monkeypatch.setattr(parser_module, "_parse_cache_bytes", 0)
+
+
+def test_parse_cache_is_bounded_by_bytes(tmp_path, monkeypatch, empty_parse_cache):
+    monkeypatch.setattr(parser_module, "_PARSE_CACHE_BYTES", 250)
+    paths = []
+    for name in ("a.txt", "b.txt", "c.txt"):
+        path = tmp_path / name
+        path.write_text(name * 25, encoding="utf-8")  # 125 bytes each
+        paths.append(str(path))
+
+    for path in paths:
+        FileParser.parse_file(path)
+
+    assert parser_module._parse_cache_bytes <= 250
+    cached_paths = [key[0] for key in parser_module._parse_cache]
+    assert cached_paths == [str(tmp_path / "b.txt"), str(tmp_path / "c.txt")]
+
+
+def test_files_over_the_budget_are_not_cached(tmp_path, monkeypatch, empty_parse_cache):
+    monkeypatch.setattr(parser_module, "_PARSE_CACHE_BYTES", 10)
+    path = tmp_path / "big.txt"
+    path.write_text("more than ten bytes of text", encoding="utf-8")
+
+    messages, _ = FileParser.parse_file(str(path))
+
+    assert messages[0]["content"] == "more than ten bytes of text"
+    assert not parser_module._parse_cache
+
+
+LONG_MD_CHAT = "\n".join(f"**User:** question {i}\n**Assistant:** answer {i}" for i in range(40))
+
+
+def test_detect_content_type_ignores_md_upload_override():
+    assert FileParser.detect_content_type(LONG_MD_CHAT, ".md") == "markdown_chat"
+
+
+def test_long_md_files_are_parsed_as_plain_text():
+    messages, metadata = FileParser.parse_content(LONG_MD_CHAT, "notes.md")
+
+    assert len(messages) == 1
+    assert messages[0]["content"] == LONG_MD_CHAT.strip()
+    assert metadata["filename"] == "notes.md"
+
+
+def test_streamed_json_chat_matches_full_parse(tmp_path):
+    pytest.importorskip("ijson")
+    chat = {
+        "id": "chat-1",
+        "created": "2024-01-02",  # not epoch milliseconds
+        "updated": 1704153600000.5,
+        "messages": [
+            {"role": "user", "content": "  What changed?  "},
+            {"role": None, "content": "Role is null"},
+            {"role": "assistant", "content": 42},
+            {"role": "assistant", "content": [{"type": "text", "text": "parts"}]},
+            "not a record",
+            {"role": "AI Assistant", "content": "The parser was refactored.", "meta": {"tokens": [1, 2]}},
+            {"role": "tool", "content": "   "},
+        ],
+    }
+    path = tmp_path / "chat.json"
+    path.write_text(json.dumps(chat), encoding="utf-8")
+
+    streamed = FileParser._stream_json_chat(path)
+
+    assert streamed == FileParser._parse_json_chat_data(json.loads(path.read_text(encoding="utf-8")))
+    messages, metadata = streamed
+    assert [m["content"] for m in messages] == ["What changed?", "Role is null", "The parser was refactored."]
+    assert metadata["created"] == "2024-01-02"
+
+
+@pytest.mark.parametrize("content", [
+    "**User:** first line\nsecond line\n\n**Assistant:** reply line\n- item one\n- item two",
+    "## User\nfirst line\nsecond line\n\n## Assistant\nreply line\n- item one\n- item two",
+    "[User] first line\nsecond line\n\n[Assistant] reply line\n- item one\n- item two",
+])
+def test_markdown_chat_keeps_multi_line_message_bodies(content):
+    messages, _ = FileParser.parse_markdown_chat(content)
+
+    assert messages == [
+        {"role": "user", "content": "first line\nsecond line"},
+        {"role": "assistant", "content": "reply line\n- item one\n- item two"},
+    ]
@@ -0,0 +1,28 @@
+"""Tests for MemorySearcher's short-lived result cache."""
+
+
+def test_repeated_search_is_served_from_cache(searcher, fake_client):
+    first = searcher.search_by_query("release")
+    first.clear()
+    second = searcher.search_by_query("release")
+
+    assert fake_client.searches == 1
+    assert second == fake_client.search_response
+
+
+def test_upload_invalidates_cached_results(searcher, uploader, fake_client):
+    searcher.search_by_query("release")
+    uploader.upload_text("The release moved to Monday.")
+    searcher.search_by_query("release")
+
+    assert fake_client.searches == 2
+
+
+def test_cached_dict_response_keeps_its_shape(searcher, fake_client):
+    fake_client.search_response = {"results": [{"id": "m1", "memory": "Release is on Friday"}]}
+    searcher.search_by_query("release")
+    cached = searcher.search_by_query("release")
+
+    assert fake_client.searches == 1
+    assert cached == fake_client.search_response
+    assert cached["results"] is not fake_client.search_response["results"]
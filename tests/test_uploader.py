@@ -0,0 +1,188 @@
+"""Tests for MemoryUploader's upload cache."""
+
+import json
+
+
+def write_chat(path, message_count: int):
+    """Write a JSON chat export with message_count alternating messages."""
+    messages = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"Message number {i} about the project"}
+        for i in range(message_count)
+    ]
+    path.write_text(json.dumps({"id": "chat-1", "title": "Chat", "messages": messages}), encoding="utf-8")
+    return str(path)
+
+
+def test_failed_batches_are_not_cached(uploader, fake_client, tmp_path):
+    # More messages than message_processing.batch_threshold, so the upload is batched
+    chat_path = write_chat(tmp_path / "chat.json", 12)
+    fake_client.fail_adds = True
+
+    result = uploader.upload_file(chat_path)
+    assert result["successful_batches"] == 0
+    assert result["failed_batches"] == result["total_batches"]
+    calls_after_first = len(fake_client.added)
+
+    fake_client.fail_adds = False
+    retried = uploader.upload_file(chat_path)
+    assert not retried.get("cached")
+    assert len(fake_client.added) > calls_after_first
+
+
+NOTES = "Standup notes: the parser refactor landed, search caching is next, and the release is planned for Friday."
+
+
+def test_unchanged_text_is_skipped(uploader, fake_client):
+    first = uploader.upload_text(NOTES)
+    second = uploader.upload_text(NOTES)
+
+    assert len(fake_client.added) == 1
+    assert second["cached"] is True
+    assert second["results"] == first["results"]
+
+
+def test_failed_text_upload_is_not_skipped(uploader, fake_client):
+    fake_client.fail_adds = True
+    try:
+        uploader.upload_text(NOTES)
+    except RuntimeError:
+        pass
+    calls_after_failure = len(fake_client.added)
+
+    fake_client.fail_adds = False
+    result = uploader.upload_text(NOTES)
+    assert not result.get("cached")
+    assert len(fake_client.added) == calls_after_failure + 1
+
+
+def test_near_duplicate_is_reported_not_reused(uploader, fake_client):
+    uploader.upload_text(NOTES)
+    # Same words, different whitespace: a different digest but the same SimHash
+    result = uploader.upload_text(NOTES.replace(" ", "\n", 3))
+
+    assert len(fake_client.added) == 1
+    assert result["cached"] is True
+    assert result["near_duplicate_of"].startswith("text 'Standup notes")
+    assert "results" not in result
+
+
+def test_batch_duplicates_are_skipped(uploader, fake_client, tmp_path):
+    original = tmp_path / "a.md"
+    original.write_text("# Notes\n\nShip the parser refactor.", encoding="utf-8")
+    copy = tmp_path / "b.md"
+    copy.write_bytes(original.read_bytes())
+
+    results = uploader.upload_batch([str(original), str(copy)], concurrent_upload=False)
+
+    assert [r["status"] for r in results] == ["success", "skipped"]
+    assert results[1]["duplicate_of"] == str(original)
+    assert "result" not in results[1]
+    assert len(fake_client.added) == 1
+
+
+def test_batch_skips_hashing_without_cache(make_config, fake_client, tmp_path, monkeypatch):
+    from core.cache import UploadCache
+    from core.uploader import MemoryUploader
+
+    uploader = MemoryUploader(make_config({"upload_cache": {"enabled": False}}))
+    hashed = []
+    monkeypatch.setattr(UploadCache, "file_digest", staticmethod(lambda path: hashed.append(path) or path))
+    note = tmp_path / "a.md"
+    note.write_text("Ship the parser refactor.", encoding="utf-8")
+
+    results = uploader.upload_batch([str(note)], concurrent_upload=False)
+
+    assert results[0]["status"] == "success"
+    assert hashed == []
+
+
+def test_oversized_files_are_not_prefetched(make_config, fake_client, tmp_path, monkeypatch):
+    from core.parser import FileParser
+    from core.uploader import MemoryUploader
+
+    uploader = MemoryUploader(make_config({"file_processing": {"max_file_size_mb": 0}}))
+    parsed = []
+    monkeypatch.setattr(FileParser, "parse_file", staticmethod(lambda path, mode="auto": parsed.append(path)))
+    note = tmp_path / "a.md"
+    note.write_text("Ship the parser refactor.", encoding="utf-8")
+
+    results = uploader.upload_batch([str(note)], concurrent_upload=False)
+
+    assert results[0]["status"] == "error"
+    assert "File too large" in results[0]["error"]
+    assert parsed == []
+
+
+def test_ping_times_out_without_touching_the_client(uploader, fake_client, monkeypatch):
+    import threading
+
+    release = threading.Event()
+    calls = []
+
+    def slow_get_all(**kwargs):
+        calls.append(kwargs)
+        release.wait(5)
+        return {"results": []}
+
+    monkeypatch.setattr(fake_client, "get_all", slow_get_all, raising=False)
+    try:
+        assert uploader.ping("alice", timeout=0.05) is False
+    finally:
+        release.set()
+    assert calls == [{"filters": {"user_id": "alice"}, "page": 1, "page_size": 1}]
+
+    monkeypatch.setattr(fake_client, "get_all", lambda **kwargs: {"results": []}, raising=False)
+    assert uploader.ping("alice") is True
+
+
+def test_force_uploads_fileobjs_again(uploader, fake_client):
+    import io
+
+    def files():
+        return [("notes.md", io.BytesIO(NOTES.encode("utf-8")))]
+
+    uploader.upload_fileobjs(files(), concurrent_upload=False)
+    skipped = uploader.upload_fileobjs(files(), concurrent_upload=False)
+    forced = uploader.upload_fileobjs(files(), concurrent_upload=False, force=True)
+
+    assert skipped[0]["result"]["cached"] is True
+    assert not forced[0]["result"].get("cached")
+    assert len(fake_client.added) == 2
+
+
+def test_directory_scan_includes_symlinked_files(uploader, tmp_path):
+    import os
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "a.md").write_text("A", encoding="utf-8")
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "b.md").write_text("B", encoding="utf-8")
+    os.symlink(outside / "b.md", docs / "link.md")
+    os.symlink(outside, docs / "linked_dir")
+
+    found = sorted(os.path.basename(path) for path in uploader._iter_supported_files(str(docs)))
+
+    assert found == ["a.md", "link.md"]
+
+
+def test_batch_hashes_each_file_once(uploader, fake_client, tmp_path, monkeypatch):
+    from core.cache import UploadCache
+
+    hashed = []
+    stream_digest = UploadCache.stream_digest
+    monkeypatch.setattr(UploadCache, "stream_digest",
+                        staticmethod(lambda f, *args: hashed.append(f.name) or stream_digest(f, *args)))
+    paths = []
+    for name in ("a.md", "b.md"):
+        note = tmp_path / name
+        note.write_text(f"Notes from {name}.", encoding="utf-8")
+        paths.append(str(note))
+
+    results = uploader.upload_batch(paths, concurrent_upload=False)
+
+    assert [r["status"] for r in results] == ["success", "success"]
+    assert sorted(hashed) == paths
+    # The digests from the batch scan still key the upload cache
+    assert uploader.upload_file(paths[0])["cached"] is True
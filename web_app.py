@@ -4,18 +4,17 @@ A Streamlit-based web interface for uploading and searching memories.
 """
 
 import streamlit as st
-import pandas as pd
-import json
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+import queue
+import threading
+from datetime import date, timedelta
+from typing import Dict, Any, Optional, Tuple
 
 from core.config import Config
 from core.uploader import MemoryUploader
 from core.searcher import MemorySearcher
 from core.web_helpers import (
     perform_search, perform_time_search, generate_weekly_report,
-    display_search_results, show_stats, create_advanced_settings_ui,
-    create_metadata_ui, process_exclude_presets
+    show_stats, create_metadata_ui, resolve_upload_settings
 )
 
 # Page configuration
@@ -26,40 +25,48 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize session state
-if 'config' not in st.session_state:
-    try:
-        st.session_state.config = Config()
-        st.session_state.uploader = MemoryUploader(st.session_state.config)
-        st.session_state.searcher = MemorySearcher(st.session_state.config)
-        st.session_state.initialized = True
-    except Exception as e:
-        st.session_state.initialized = False
-        st.session_state.init_error = str(e)
+# File types accepted by the upload widgets
+SUPPORTED_TYPES = ("md", "txt", "markdown", "json")
+
+# Fragments rerun only their own widgets on interaction (Streamlit 1.37+; the
+# experimental name before that, and a plain function call on older versions)
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
 
-# Load persistent advanced settings from config
-if 'advanced_settings_loaded' not in st.session_state:
-    # Load from config file first time
-    st.session_state.advanced_settings = {
-        'custom_instructions': st.session_state.config.advanced_custom_instructions,
-        'includes': st.session_state.config.advanced_includes,
-        'excludes': st.session_state.config.advanced_excludes,
-        'exclude_presets': st.session_state.config.advanced_exclude_presets,
-        'infer': st.session_state.config.advanced_infer,
-    }
-    st.session_state.advanced_settings_loaded = True
+
+@st.cache_resource
+def get_services() -> Tuple[Config, MemoryUploader, MemorySearcher]:
+    """Create the config, uploader and searcher once, shared by every session."""
+    config = Config()
+    return config, MemoryUploader(config), MemorySearcher(config)
 
 def main():
     """Main application function."""
     st.title("🧠 Mem0 Client")
     st.markdown("Upload and search your memories with AI-powered processing")
     
-    # Check initialization
-    if not st.session_state.get('initialized', False):
-        st.error(f"❌ Initialization failed: {st.session_state.get('init_error', 'Unknown error')}")
+    # Check initialization (failures are not cached, so the next rerun tries again)
+    try:
+        config, uploader, searcher = get_services()
+    except Exception as e:
+        st.error(f"❌ Initialization failed: {str(e)}")
         st.info("💡 Please make sure MEM0_API_KEY environment variable is set")
         return
     
+    # Load persistent advanced settings from config, once per session
+    if 'advanced_settings' not in st.session_state:
+        advanced_settings = {
+            'custom_instructions': config.advanced_custom_instructions,
+            'includes': config.advanced_includes,
+            'excludes': config.advanced_excludes,
+            'exclude_presets': config.advanced_exclude_presets,
+            'infer': config.advanced_infer,
+        }
+        # Upload arguments only change when the settings are saved, so resolve them then
+        st.session_state.update(
+            advanced_settings=advanced_settings,
+            upload_settings=resolve_upload_settings(advanced_settings)
+        )
+    
     # Sidebar configuration
     with st.sidebar:
         st.header("⚙️ Settings")
@@ -67,7 +74,7 @@ def main():
         # User ID input
         user_id = st.text_input(
             "User ID",
-            value=st.session_state.config.default_user_id,
+            value=config.default_user_id,
             help="Identifier for your memories"
         )
         
@@ -76,97 +83,140 @@ def main():
         # Advanced Settings in sidebar
         st.subheader("🎯 Advanced Settings")
         
-        # Custom Instructions
-        custom_instructions = st.text_area(
-            "Custom Instructions",
-            value=st.session_state.advanced_settings['custom_instructions'],
-            placeholder="Guide AI on how to process and extract memories...",
-            help="Custom instructions for AI processing",
-            height=80,
-            key="sidebar_custom_instructions"
-        )
-        
-        # Includes and Excludes in columns
-        col1, col2 = st.columns(2)
-        with col1:
-            includes = st.text_input(
-                "Includes",
-                value=st.session_state.advanced_settings['includes'],
-                placeholder="tech docs, APIs",
-                help="Content types to include",
-                key="sidebar_includes"
+        # Widgets in a form only submit on Save, instead of rerunning per keystroke
+        with st.form("advanced_settings_form", clear_on_submit=False):
+            # Custom Instructions
+            custom_instructions = st.text_area(
+                "Custom Instructions",
+                value=st.session_state.advanced_settings['custom_instructions'],
+                placeholder="Guide AI on how to process and extract memories...",
+                help="Custom instructions for AI processing",
+                height=80,
+                key="sidebar_custom_instructions"
             )
-        
-        with col2:
-            excludes = st.text_input(
-                "Excludes",
-                value=st.session_state.advanced_settings['excludes'],
-                placeholder="personal info",
-                help="Content types to exclude",
-                key="sidebar_excludes"
+
+            # Includes and Excludes in columns
+            col1, col2 = st.columns(2)
+            with col1:
+                includes = st.text_input(
+                    "Includes",
+                    value=st.session_state.advanced_settings['includes'],
+                    placeholder="tech docs, APIs",
+                    help="Content types to include",
+                    key="sidebar_includes"
+                )
+
+            with col2:
+                excludes = st.text_input(
+                    "Excludes",
+                    value=st.session_state.advanced_settings['excludes'],
+                    placeholder="personal info",
+                    help="Content types to exclude",
+                    key="sidebar_excludes"
+                )
+
+            # Exclude presets
+            exclude_presets = st.multiselect(
+                "Privacy Presets",
+                ["Personal Names", "Contact Info", "Address", "Financial", "Passwords", "ID Numbers", "Sensitive Info"],
+                default=st.session_state.advanced_settings['exclude_presets'],
+                help="Common exclusion presets",
+                key="sidebar_exclude_presets"
             )
-        
-        # Exclude presets
-        exclude_presets = st.multiselect(
-            "Privacy Presets",
-            ["Personal Names", "Contact Info", "Address", "Financial", "Passwords", "ID Numbers", "Sensitive Info"],
-            default=st.session_state.advanced_settings['exclude_presets'],
-            help="Common exclusion presets",
-            key="sidebar_exclude_presets"
-        )
-        
-        # Infer setting
-        infer = st.checkbox(
-            "Infer Memories",
-            value=st.session_state.advanced_settings['infer'],
-            help="AI intelligent processing vs raw storage",
-            key="sidebar_infer"
-        )
-        
-        # Save settings button
-        if st.button("💾 Save Settings", type="secondary"):
-            # Update session state
-            st.session_state.advanced_settings.update({
-                'custom_instructions': custom_instructions,
-                'includes': includes,
-                'excludes': excludes,
-                'exclude_presets': exclude_presets,
-                'infer': infer
-            })
-            
-            # Save to config file
-            st.session_state.config.update_advanced_settings(
-                custom_instructions=custom_instructions,
-                includes=includes,
-                excludes=excludes,
-                exclude_presets=exclude_presets,
-                infer=infer
+
+            # Infer setting
+            infer = st.checkbox(
+                "Infer Memories",
+                value=st.session_state.advanced_settings['infer'],
+                help="AI intelligent processing vs raw storage",
+                key="sidebar_infer"
             )
+
+            # Save settings button
+            if st.form_submit_button("💾 Save Settings"):
+                # Update session state
+                st.session_state.advanced_settings.update({
+                    'custom_instructions': custom_instructions,
+                    'includes': includes,
+                    'excludes': excludes,
+                    'exclude_presets': exclude_presets,
+                    'infer': infer
+                })
+                st.session_state.upload_settings = resolve_upload_settings(st.session_state.advanced_settings)
             
-            st.success("✅ Settings saved!")
+                # Save to config file
+                config.update_advanced_settings(
+                    custom_instructions=custom_instructions,
+                    includes=includes,
+                    excludes=excludes,
+                    exclude_presets=exclude_presets,
+                    infer=infer
+                )
+            
+                st.success("✅ Settings saved!")
         
         st.divider()
         
         # Quick stats
-        if st.button("📊 Show Stats"):
-            show_stats(st.session_state.searcher, user_id)
+        stats_panel(searcher, user_id)
     
     # Main tabs
     tab1, tab2, tab3, tab4 = st.tabs(["📤 Upload", "🔍 Search", "📅 Time Search", "📊 Weekly Report"])
     
     with tab1:
-        upload_interface(user_id)
+        upload_interface(uploader, user_id)
     
     with tab2:
-        search_interface(user_id)
+        search_interface(searcher, user_id)
     
     with tab3:
-        time_search_interface(user_id)
+        time_search_interface(searcher, user_id)
     
     with tab4:
-        weekly_report_interface(user_id)
+        weekly_report_interface(searcher, user_id)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def preview_text(file_key: str, _uploaded_file) -> str:
+    """Decode the first KiB of an uploaded file, once per file."""
+    # A cut multi-byte character at the end becomes U+FFFD
+    _uploaded_file.seek(0)
+    head = _uploaded_file.read(1024)
+    _uploaded_file.seek(0)  # Reset file pointer
+    return head.decode("utf-8", errors="replace")
+
+@fragment
+def preview_panel(uploaded_file):
+    """Preview checkbox; toggling it reruns only the preview, not the upload form."""
+    if st.checkbox("👀 Preview content"):
+        try:
+            file_key = getattr(uploaded_file, "file_id", f"{uploaded_file.name}:{uploaded_file.size}")
+            content = preview_text(file_key, uploaded_file)
+            st.text_area("Content Preview", content + "..." if uploaded_file.size > 1024 else content, height=200)
+        except Exception as e:
+            st.error(f"❌ Cannot preview file: {str(e)}")
 
-def upload_interface(user_id: str):
+def _skipped_message(result: Any, name: str) -> Optional[str]:
+    """Describe an upload the cache skipped (like the CLI's Upload Skipped), or None if it was sent."""
+    if not isinstance(result, dict) or not result.get("cached"):
+        return None
+    if result.get("near_duplicate_of"):
+        message = f"♻️ {name} is near-identical to already uploaded {result['near_duplicate_of']}, skipped"
+    else:
+        message = f"♻️ {name} was already uploaded, skipped"
+    return message + " (tick 'Upload even if already uploaded' to send it anyway)"
+
+def _upload_kwargs(user_id: str, force: bool = False) -> Dict[str, Any]:
+    """Keyword arguments shared by the text, file and batch uploads."""
+    return dict(user_id=user_id, extract_mode="auto", force=force, **st.session_state.upload_settings)
+
+@fragment
+def stats_panel(searcher: MemorySearcher, user_id: str):
+    """Sidebar stats button; showing stats does not rerun the main tabs."""
+    if st.button("📊 Show Stats"):
+        show_stats(searcher, user_id)
+
+@fragment
+def upload_interface(uploader: MemoryUploader, user_id: str):
     """Upload interface."""
     st.header("📤 Upload Memories")
     
@@ -177,6 +227,12 @@ def upload_interface(user_id: str):
         horizontal=True
     )
     
+    # Same as the CLI's --no-cache: send content the upload cache would skip
+    force_upload = st.checkbox(
+        "♻️ Upload even if already uploaded",
+        help="Skip the check for identical or near-identical content uploaded before"
+    )
+    
     if upload_method == "Text":
         # Text upload
         st.subheader("📝 Upload Text")
@@ -193,39 +249,34 @@ def upload_interface(user_id: str):
         if st.button("📤 Upload Text", type="primary"):
             if text_content.strip():
                 # Get settings from sidebar
-                final_excludes = process_exclude_presets(
-                    st.session_state.advanced_settings['excludes'], 
-                    st.session_state.advanced_settings['exclude_presets']
-                )
+                upload_settings = st.session_state.upload_settings
                 
                 try:
                     with st.spinner("Uploading..."):
-                        result = st.session_state.uploader.upload_text(
+                        result = uploader.upload_text(
                             content=text_content,
-                            user_id=user_id,
-                            extract_mode="auto",  # Always use auto mode
                             metadata=metadata,
-                            custom_instructions=st.session_state.advanced_settings['custom_instructions'].strip() or None,
-                            includes=st.session_state.advanced_settings['includes'].strip() or None,
-                            excludes=final_excludes.strip() or None,
-                            infer=st.session_state.advanced_settings['infer']
+                            **_upload_kwargs(user_id, force_upload)
                         )
-                    st.success("✅ Text uploaded successfully!")
                     
-                    # Show applied settings if any are configured
-                    applied_settings = []
-                    if st.session_state.advanced_settings['custom_instructions'].strip():
-                        applied_settings.append(f"**Custom Instructions:** {st.session_state.advanced_settings['custom_instructions'].strip()}")
-                    if st.session_state.advanced_settings['includes'].strip():
-                        applied_settings.append(f"**Includes:** {st.session_state.advanced_settings['includes'].strip()}")
-                    if final_excludes.strip():
-                        applied_settings.append(f"**Excludes:** {final_excludes.strip()}")
-                    applied_settings.append(f"**Infer Memories:** {st.session_state.advanced_settings['infer']}")
-                    
-                    if applied_settings:
+                    skipped = _skipped_message(result, "Text")
+                    if skipped:
+                        st.info(skipped)
+                    else:
+                        st.success("✅ Text uploaded successfully!")
+                        
+                        # Show applied settings if any are configured
+                        applied_settings = []
+                        if upload_settings['custom_instructions']:
+                            applied_settings.append(f"**Custom Instructions:** {upload_settings['custom_instructions']}")
+                        if upload_settings['includes']:
+                            applied_settings.append(f"**Includes:** {upload_settings['includes']}")
+                        if upload_settings['excludes']:
+                            applied_settings.append(f"**Excludes:** {upload_settings['excludes']}")
+                        applied_settings.append(f"**Infer Memories:** {upload_settings['infer']}")
+                        
                         with st.expander("📋 Applied Settings"):
-                            for setting in applied_settings:
-                                st.write(setting)
+                            st.markdown("  \n".join(applied_settings))
                     
                 except Exception as e:
                     st.error(f"❌ Upload failed: {str(e)}")
@@ -238,7 +289,7 @@ def upload_interface(user_id: str):
         
         uploaded_file = st.file_uploader(
             "Choose a file",
-            type=['md', 'txt', 'markdown', 'json'],
+            type=SUPPORTED_TYPES,
             help="Supported formats: .md, .txt, .markdown, .json (conversation files)"
         )
         
@@ -247,45 +298,23 @@ def upload_interface(user_id: str):
             st.info(f"📄 File: {uploaded_file.name} ({uploaded_file.size} bytes)")
             
             # Preview content
-            if st.checkbox("👀 Preview content"):
-                try:
-                    content = str(uploaded_file.read(), "utf-8")
-                    st.text_area("Content Preview", content[:1000] + "..." if len(content) > 1000 else content, height=200)
-                    uploaded_file.seek(0)  # Reset file pointer
-                except Exception as e:
-                    st.error(f"❌ Cannot preview file: {str(e)}")
+            preview_panel(uploaded_file)
             
             if st.button("📤 Upload File", type="primary"):
                 try:
-                    # Get settings from sidebar
-                    final_excludes = process_exclude_presets(
-                        st.session_state.advanced_settings['excludes'], 
-                        st.session_state.advanced_settings['exclude_presets']
-                    )
-                    
-                    # Save uploaded file temporarily
-                    import tempfile
-                    import os
-                    
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{uploaded_file.name}") as tmp_file:
-                        tmp_file.write(uploaded_file.getvalue())
-                        tmp_path = tmp_file.name
-                    
+                    # Parsed straight from the upload, no temp file needed
                     with st.spinner("Uploading..."):
-                        result = st.session_state.uploader.upload_file(
-                            file_path=tmp_path,
-                            user_id=user_id,
-                            extract_mode="auto",  # Always use auto mode
-                            custom_instructions=st.session_state.advanced_settings['custom_instructions'].strip() or None,
-                            includes=st.session_state.advanced_settings['includes'].strip() or None,
-                            excludes=final_excludes.strip() or None,
-                            infer=st.session_state.advanced_settings['infer']
+                        result = uploader.upload_fileobj(
+                            fileobj=uploaded_file,
+                            filename=uploaded_file.name,
+                            **_upload_kwargs(user_id, force_upload)
                         )
                     
-                    # Clean up temp file
-                    os.unlink(tmp_path)
-                    
-                    st.success(f"✅ File '{uploaded_file.name}' uploaded successfully!")
+                    skipped = _skipped_message(result, f"File '{uploaded_file.name}'")
+                    if skipped:
+                        st.info(skipped)
+                    else:
+                        st.success(f"✅ File '{uploaded_file.name}' uploaded successfully!")
                     
                 except Exception as e:
                     st.error(f"❌ Upload failed: {str(e)}")
@@ -296,25 +325,26 @@ def upload_interface(user_id: str):
         
         uploaded_files = st.file_uploader(
             "Choose multiple files",
-            type=['md', 'txt', 'markdown', 'json'],
+            type=SUPPORTED_TYPES,
             accept_multiple_files=True,
             help="Upload multiple files at once. Supported formats: .md, .txt, .markdown, .json"
         )
         
         if uploaded_files:
-            st.info(f"📄 Selected {len(uploaded_files)} files")
+            # Names and sizes, read once for every listing below
+            file_info = [(uploaded_file.name, uploaded_file.size) for uploaded_file in uploaded_files]
+            st.info(f"📄 Selected {len(file_info)} files")
             
             # Show file list
             with st.expander("📋 File List", expanded=True):
-                for i, file in enumerate(uploaded_files, 1):
-                    st.write(f"{i}. {file.name} ({file.size} bytes)")
+                st.text("\n".join(f"{i}. {name} ({size} bytes)" for i, (name, size) in enumerate(file_info, 1)))
             
             # Processing options
             col1, col2 = st.columns(2)
             with col1:
                 concurrent_upload = st.checkbox(
                     "Concurrent Upload",
-                    value=st.session_state.config.concurrent_upload,
+                    value=uploader.config.concurrent_upload,
                     help="Process files concurrently for faster upload"
                 )
             
@@ -324,7 +354,7 @@ def upload_interface(user_id: str):
                         "Max Concurrent Files",
                         min_value=1,
                         max_value=5,
-                        value=st.session_state.config.max_concurrent_files,
+                        value=uploader.config.max_concurrent_files,
                         help="Maximum number of files to process simultaneously"
                     )
                 else:
@@ -333,67 +363,77 @@ def upload_interface(user_id: str):
             
             if st.button("📤 Upload All Files", type="primary"):
                 try:
-                    # Get settings from sidebar
-                    final_excludes = process_exclude_presets(
-                        st.session_state.advanced_settings['excludes'], 
-                        st.session_state.advanced_settings['exclude_presets']
-                    )
-                    
-                    # Save all files temporarily
-                    import tempfile
-                    import os
+                    # Upload on a worker thread (straight from the uploads, no temp
+                    # files) and report each file here as soon as it finishes
+                    progress_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+                    outcome: Dict[str, Any] = {}
+                    # Read session state here; the worker thread has no script context
+                    upload_kwargs = _upload_kwargs(user_id, force_upload)
                     
-                    temp_files = []
-                    for uploaded_file in uploaded_files:
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{uploaded_file.name}") as tmp_file:
-                            tmp_file.write(uploaded_file.getvalue())
-                            temp_files.append(tmp_file.name)
-                    
-                    try:
-                        with st.spinner(f"Uploading {len(temp_files)} files..."):
-                            # Create a placeholder for results
-                            results_placeholder = st.empty()
-                            
-                            # Use the enhanced batch upload function
-                            results = st.session_state.uploader.upload_batch(
-                                file_paths=temp_files,
-                                user_id=user_id,
-                                extract_mode="auto",
-                                custom_instructions=st.session_state.advanced_settings['custom_instructions'].strip() or None,
-                                includes=st.session_state.advanced_settings['includes'].strip() or None,
-                                excludes=final_excludes.strip() or None,
-                                infer=st.session_state.advanced_settings['infer'],
-                                concurrent_upload=concurrent_upload
+                    def run_batch():
+                        try:
+                            outcome["results"] = uploader.upload_fileobjs(
+                                [(uploaded_file.name, uploaded_file) for uploaded_file in uploaded_files],
+                                **upload_kwargs,
+                                concurrent_upload=concurrent_upload,
+                                max_workers=max_workers,
+                                progress_callback=progress_queue.put_nowait
                             )
-                        
-                        # Display results
-                        success_count = sum(1 for r in results if r["status"] == "success")
-                        error_count = len(results) - success_count
-                        
-                        if success_count > 0:
-                            st.success(f"✅ Successfully uploaded {success_count}/{len(uploaded_files)} files!")
-                        
-                        if error_count > 0:
-                            st.error(f"❌ {error_count} files failed to upload")
-                        
-                        # Detailed results
-                        with st.expander("📊 Detailed Results", expanded=error_count > 0):
-                            for i, result in enumerate(results):
-                                original_filename = uploaded_files[i].name
-                                if result["status"] == "success":
-                                    attempts = result.get("attempts", 1)
-                                    attempt_text = f" (took {attempts} attempts)" if attempts > 1 else ""
-                                    st.write(f"✅ {original_filename}{attempt_text}")
-                                else:
-                                    st.write(f"❌ {original_filename}: {result['error']}")
+                        except Exception as e:
+                            outcome["error"] = e
                     
-                    finally:
-                        # Clean up temp files
-                        for temp_file in temp_files:
+                    worker = threading.Thread(target=run_batch, daemon=True)
+                    with st.status(f"Uploading {len(file_info)} files...", expanded=True) as status:
+                        worker.start()
+                        finished = 0
+                        while worker.is_alive() or not progress_queue.empty():
                             try:
-                                os.unlink(temp_file)
-                            except:
-                                pass  # Ignore cleanup errors
+                                file_result = progress_queue.get(timeout=0.2)
+                            except queue.Empty:
+                                continue
+                            finished += 1
+                            if file_result["status"] == "success":
+                                status.write(_skipped_message(file_result.get("result"), file_result['file'])
+                                             or f"✅ {file_result['file']}")
+                            else:
+                                status.write(f"❌ {file_result['file']}: {file_result['error']}")
+                            status.update(label=f"Uploaded {finished}/{len(file_info)} files...")
+                        worker.join()
+                        
+                        if "error" in outcome:
+                            status.update(label="Batch upload failed", state="error")
+                            raise outcome["error"]
+                        results = outcome["results"]
+                        status.update(label=f"Finished {len(results)} files", state="complete", expanded=False)
+                    
+                    # Display results
+                    success_count = sum(1 for r in results if r["status"] == "success")
+                    error_count = len(results) - success_count
+                    skipped_count = sum(1 for r in results if r["status"] == "success" and
+                                        isinstance(r.get("result"), dict) and r["result"].get("cached"))
+                    
+                    if success_count > skipped_count:
+                        st.success(f"✅ Successfully uploaded {success_count - skipped_count}/{len(file_info)} files!")
+                    
+                    if skipped_count > 0:
+                        st.info(f"♻️ {skipped_count} files were already uploaded and skipped")
+                    
+                    if error_count > 0:
+                        st.error(f"❌ {error_count} files failed to upload")
+                    
+                    # Detailed results
+                    with st.expander("📊 Detailed Results", expanded=error_count > 0):
+                        # One element for all files rather than one per file
+                        lines = []
+                        for (name, _), result in zip(file_info, results):
+                            if result["status"] == "success":
+                                attempts = result.get("attempts", 1)
+                                attempt_text = f" (took {attempts} attempts)" if attempts > 1 else ""
+                                lines.append(_skipped_message(result.get("result"), name)
+                                             or f"✅ {name}{attempt_text}")
+                            else:
+                                lines.append(f"❌ {name}: {result['error']}")
+                        st.text("\n".join(lines))
                     
                 except Exception as e:
                     st.error(f"❌ Batch upload failed: {str(e)}")
@@ -401,7 +441,8 @@ def upload_interface(user_id: str):
         else:
             st.info("👆 Select multiple files to upload them in batch")
 
-def search_interface(user_id: str):
+@fragment
+def search_interface(searcher: MemorySearcher, user_id: str):
     """Search interface."""
     st.header("🔍 Search Memories")
     
@@ -412,22 +453,26 @@ def search_interface(user_id: str):
         help="Enter keywords or a natural language query"
     )
     
-    col1, col2, col3 = st.columns([2, 1, 1])
+    col1, col2 = st.columns([3, 1])
     
     with col1:
         if st.button("🔍 Search", type="primary"):
             if query.strip():
-                perform_search(st.session_state.searcher, query, user_id)
+                st.session_state.setdefault('last_search', {})[user_id] = query
             else:
                 st.warning("⚠️ Please enter a search query")
     
     with col2:
-        limit = st.number_input("Max Results", min_value=1, max_value=100, value=10)
-    
-    with col3:
         show_full = st.checkbox("Show Full Content")
+    
+    # Keep showing the current user's last search while other widgets rerun
+    # this tab; the fetch is cached, so only rendering is repeated
+    last_query = st.session_state.get('last_search', {}).get(user_id)
+    if last_query is not None:
+        perform_search(searcher, last_query, user_id, show_full=show_full)
 
-def time_search_interface(user_id: str):
+@fragment
+def time_search_interface(searcher: MemorySearcher, user_id: str):
     """Time-based search interface."""
     st.header("📅 Time-based Search")
     
@@ -446,27 +491,31 @@ def time_search_interface(user_id: str):
             query = st.text_input("Optional Query", placeholder="Search within time range")
         
         if st.button("📅 Search by Days", type="primary"):
-            perform_time_search(st.session_state.searcher, user_id=user_id, days_back=days_back, query=query or None)
+            perform_time_search(searcher, user_id=user_id, days_back=days_back, query=query or None)
     
     else:
+        # Fixed for the session, so the default dates stay stable across reruns
+        today = st.session_state.setdefault('today', date.today())
+        
         col1, col2, col3 = st.columns(3)
         with col1:
-            start_date = st.date_input("Start Date", value=datetime.now() - timedelta(days=7))
+            start_date = st.date_input("Start Date", value=today - timedelta(days=7))
         with col2:
-            end_date = st.date_input("End Date", value=datetime.now())
+            end_date = st.date_input("End Date", value=today)
         with col3:
             query = st.text_input("Optional Query", placeholder="Search within date range")
         
         if st.button("📅 Search by Date Range", type="primary"):
             perform_time_search(
-                st.session_state.searcher,
+                searcher,
                 user_id=user_id,
-                start_date=start_date.strftime('%Y-%m-%d'),
-                end_date=end_date.strftime('%Y-%m-%d'),
+                start_date=start_date.isoformat(),
+                end_date=end_date.isoformat(),
                 query=query or None
             )
 
-def weekly_report_interface(user_id: str):
+@fragment
+def weekly_report_interface(searcher: MemorySearcher, user_id: str):
     """Weekly report interface."""
     st.header("📊 Weekly Report")
     
@@ -477,7 +526,7 @@ def weekly_report_interface(user_id: str):
     
     with col2:
         if st.button("📊 Generate Report", type="primary"):
-            generate_weekly_report(st.session_state.searcher, weeks_back, user_id)
+            generate_weekly_report(searcher, weeks_back, user_id)
 
 # Functions moved to core/web_helpers.py
 